@@ -1,9 +1,26 @@
 import streamlit as st
 from webdav4.client import Client
+from pdf2image import convert_from_bytes, convert_from_path
+from pypdf import PdfReader
+from PIL import Image, ImageOps
 import io
 import os
-import base64
-from urllib.parse import unquote
+import json
+import time
+import hashlib
+import sqlite3
+import secrets
+import tempfile
+import posixpath
+import zipfile
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+RUN_STARTED = time.perf_counter()
 
 # ── 페이지 설정 ──────────────────────────────────────────────
 st.set_page_config(
@@ -47,6 +64,112 @@ except Exception as e:
     st.error(f"WebDAV 연결 실패: {e}")
     st.stop()
 
+# ── 성능 지표 (호출별 지연 시간 히스토그램) ───────────────────
+METRICS_EVENTS  = int(st.secrets.get("METRICS_EVENTS", 5000))
+METRICS_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]   # ms 상한
+
+class Metrics:
+    """작업(op)별 호출 수·지연 분포·전송량·캐시 적중 집계 (프로세스 내, 세션 공유)
+
+    최근 METRICS_EVENTS개 호출은 원본 이벤트로 남겨 JSON Lines로 내보낸다.
+    """
+
+    def __init__(self, max_events):
+        self._ops = {}                          # op -> 집계
+        self._folders = {}                      # 폴더 -> [PROPFIND 수, 총 ms]
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def record(self, op, ms, nbytes=0, path=None, hit=None, error=None):
+        bucket = next((i for i, b in enumerate(METRICS_BUCKETS) if ms <= b), len(METRICS_BUCKETS))
+        with self._lock:
+            stat = self._ops.setdefault(op, {
+                "count": 0, "ms": 0.0, "bytes": 0, "hits": 0, "misses": 0, "errors": 0,
+                "hist": [0] * (len(METRICS_BUCKETS) + 1),
+            })
+            stat["count"] += 1
+            stat["ms"] += ms
+            stat["bytes"] += nbytes
+            stat["hist"][bucket] += 1
+            if hit is not None:
+                stat["hits" if hit else "misses"] += 1
+            if error:
+                stat["errors"] += 1
+            if path and op.startswith("propfind"):
+                folder = self._folders.setdefault(dir_key(path), [0, 0.0])
+                folder[0] += 1
+                folder[1] += ms
+            self._events.append({
+                "ts": round(time.time(), 3), "op": op, "ms": round(ms, 2), "bytes": nbytes,
+                "path": path, "hit": hit, "error": error,
+            })
+
+    @staticmethod
+    def percentile(hist, q):
+        """히스토그램에서 q 분위가 속한 구간의 상한(ms), 마지막 구간은 inf"""
+        target = q * sum(hist)
+        seen = 0
+        for i, n in enumerate(hist):
+            seen += n
+            if n and seen >= target:
+                return METRICS_BUCKETS[i] if i < len(METRICS_BUCKETS) else float("inf")
+        return 0
+
+    def summary(self):
+        with self._lock:
+            return {op: {**stat, "hist": list(stat["hist"])} for op, stat in self._ops.items()}
+
+    def hot_folders(self, n=10):
+        with self._lock:
+            rows = sorted(self._folders.items(), key=lambda kv: kv[1][1], reverse=True)[:n]
+        return [(path, count, total) for path, (count, total) in rows]
+
+    def export_jsonl(self):
+        with self._lock:
+            return "\n".join(json.dumps(e, ensure_ascii=False) for e in self._events) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._ops.clear()
+            self._folders.clear()
+            self._events.clear()
+
+@st.cache_resource
+def get_metrics():
+    return Metrics(METRICS_EVENTS)
+
+metrics = get_metrics()
+
+_rerun_recorded = False
+
+def record_rerun(error=None):
+    """이번 실행 시간 기록 (실행마다 한 번) - 끝까지 가지 않는 st.stop() 경로에서도 호출"""
+    global _rerun_recorded
+    if not _rerun_recorded:
+        _rerun_recorded = True
+        metrics.record("rerun", (time.perf_counter() - RUN_STARTED) * 1000, error=error)
+
+def stop_run(error=None):
+    record_rerun(error)
+    st.stop()
+
+def rerun_run():
+    """st.rerun() 대신 - 버튼 처리(받기·삭제·ZIP 등)로 다시 그리는 실행도 기록"""
+    record_rerun()
+    st.rerun()
+
+@contextmanager
+def timed(op, path=None):
+    """with 블록 소요 시간을 기록 - 블록 안에서 m["bytes"], m["hit"] 설정 가능"""
+    m = {"bytes": 0, "hit": None}
+    start = time.perf_counter()
+    try:
+        yield m
+    except Exception as e:
+        metrics.record(op, (time.perf_counter() - start) * 1000, m["bytes"], path, m["hit"], type(e).__name__)
+        raise
+    metrics.record(op, (time.perf_counter() - start) * 1000, m["bytes"], path, m["hit"])
+
 # ── 파일 타입 분류 ────────────────────────────────────────────
 IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp"}
 PDF_EXTS   = {".pdf"}
@@ -84,16 +207,765 @@ def safe_path(path):
     """URL 인코딩된 경로를 디코딩하여 WebDAV 클라이언트에 전달"""
     return unquote(path)
 
+def dir_key(path):
+    """캐시 키: 디코딩 + 끝 슬래시 제거"""
+    return safe_path(path).rstrip("/") or "/"
+
+# ── 폴더 목록 캐시 (세션 공유) ────────────────────────────────
+LIST_CACHE_TTL  = float(st.secrets.get("LIST_CACHE_TTL", 30))
+LIST_CACHE_SIZE = int(st.secrets.get("LIST_CACHE_SIZE", 256))
+PREFETCH_WORKERS = int(st.secrets.get("PREFETCH_WORKERS", 4))
+
+def collection_validator(props):
+    """폴더 변경 감지용 (getetag, getlastmodified) - 둘 다 없으면 None"""
+    etag, modified = props.etag, props.raw.get("modified")
+    if not etag and not modified:
+        return None
+    return (etag, modified)
+
+def propfind_listing(path, op_prefix=""):
+    """PROPFIND(Depth 1) 한 번으로 폴더 검증값과 하위 목록을 함께 가져옴
+
+    op_prefix: 지표 이름 앞머리 - 백그라운드 색인은 "index."로 따로 집계
+    """
+    with timed(f"{op_prefix}propfind.list", path) as m:
+        result = client.propfind(safe_path(path), headers={"Depth": "1"}, follow_redirects=True)
+        m["bytes"] = len(result.content.encode())
+    responses = dict(result.responses)
+    me = responses.pop(client.join_url(safe_path(path)).path, None)
+    items = [
+        {"name": r.path_relative_to(client.base_url), "href": r.href, **r.properties.as_dict()}
+        for r in responses.values()
+    ]
+    return (collection_validator(me.properties) if me else None), items
+
+def propfind_validator(path, op_prefix=""):
+    """PROPFIND(Depth 0) - 폴더 자신의 검증값만 조회 (목록 없이 가벼움)"""
+    with timed(f"{op_prefix}propfind.validate", path) as m:
+        result = client.propfind(safe_path(path), headers={"Depth": "0"})
+        m["bytes"] = len(result.content.encode())
+    for r in result.responses.values():
+        return collection_validator(r.properties)
+    return None
+
+class ListingCache:
+    """경로별 폴더 목록 캐시 (TTL + LRU)
+
+    TTL 안에서는 네트워크 없이 바로 반환하고, TTL이 지나면 Depth 0
+    PROPFIND로 getetag/getlastmodified만 비교해 바뀐 경우에만 다시 읽는다.
+    prefetch()는 화면에 보이는 하위 폴더를 미리 읽어 두며, 미리 읽는
+    중인 폴더를 get()하면 새로 요청하지 않고 그 결과를 기다린다.
+    workers가 0이면 미리 읽기를 하지 않는다.
+    """
+
+    def __init__(self, ttl, max_entries, workers):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (checked_at, validator, items)
+        self._inflight = {}             # key -> Future (미리 읽는 중)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch") if workers else None
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        key = dir_key(path)
+        with self._lock:
+            pending = self._inflight.get(key)
+        if pending:
+            try:
+                return pending.result()
+            except Exception:
+                pass
+        return self._get(key, path)
+
+    def prefetch(self, paths):
+        """캐시에 없거나 TTL이 지난 폴더만 스레드 풀에서 미리 읽기"""
+        if self._pool is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for path in paths:
+                key = dir_key(path)
+                entry = self._entries.get(key)
+                if key in self._inflight or (entry and now - entry[0] < self.ttl):
+                    continue
+                self._inflight[key] = self._pool.submit(self._prefetch_one, key, path)
+
+    def _prefetch_one(self, key, path):
+        try:
+            return self._get(key, path)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _get(self, key, path):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+        if entry:
+            checked_at, validator, items = entry
+            if time.monotonic() - checked_at < self.ttl:
+                metrics.record("cache.listing", 0, path=key, hit=True)
+                return items
+            if validator is not None:
+                try:
+                    if propfind_validator(path) == validator:
+                        self._put(key, validator, items)
+                        metrics.record("cache.listing", 0, path=key, hit=True)
+                        return items
+                except Exception:
+                    pass
+        metrics.record("cache.listing", 0, path=key, hit=False)
+        validator, items = propfind_listing(path)
+        self._put(key, validator, items)
+        return items
+
+    def _put(self, key, validator, items):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), validator, items)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path, recursive=False):
+        """해당 폴더 항목 제거 (recursive면 하위 폴더 항목까지)"""
+        key = dir_key(path)
+        prefix = key.rstrip("/") + "/"
+        with self._lock:
+            for k in list(self._entries):
+                if k == key or (recursive and k.startswith(prefix)):
+                    del self._entries[k]
+
+    def invalidate_item(self, item_path):
+        """항목 변경(삭제 등) 후: 부모 폴더 + (폴더라면) 자신과 하위 전체"""
+        self.invalidate(posixpath.dirname(dir_key(item_path)) or "/")
+        if item_path.endswith("/"):
+            self.invalidate(item_path, recursive=True)
+
+@st.cache_resource
+def get_listing_cache():
+    return ListingCache(LIST_CACHE_TTL, LIST_CACHE_SIZE, PREFETCH_WORKERS)
+
+listing_cache = get_listing_cache()
+
+# ── 파일 내용 캐시 (세션 공유, RAM → 디스크) ──────────────────
+CONTENT_CACHE_MB      = float(st.secrets.get("CONTENT_CACHE_MB", 256))
+CONTENT_CACHE_DISK_MB = float(st.secrets.get("CONTENT_CACHE_DISK_MB", 2048))
+CONTENT_CACHE_DIR     = st.secrets.get(
+    "CONTENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mywebdav-cache")
+)
+
+def item_tag(item):
+    """내용 식별자: ETag, 없으면 수정 시각 + 크기"""
+    if item.get("etag"):
+        return item["etag"]
+    modified = item.get("modified") or item.get("last_modified")
+    return f"{modified}:{item.get('content_length')}"
+
+class ContentCache:
+    """href + ETag 키의 파일 내용 캐시 (LRU)
+
+    RAM 예산을 넘는 항목은 오래된 것부터 디스크로 내려가고, 디스크
+    예산을 넘으면 삭제된다. 같은 파일을 동시에 요청하면 한 번만 받는다.
+    """
+
+    def __init__(self, mem_budget, disk_budget, spill_dir):
+        self.mem_budget = mem_budget
+        self.disk_budget = disk_budget
+        self.spill_dir = spill_dir
+        os.makedirs(spill_dir, exist_ok=True)
+        for f in os.listdir(spill_dir):
+            if f.endswith(".bin"):
+                os.remove(os.path.join(spill_dir, f))
+        self._mem = OrderedDict()    # key -> bytes
+        self._disk = OrderedDict()   # key -> size
+        self._mem_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {}          # key -> Lock (동시 요청 합치기)
+
+    def _file(self, key):
+        return os.path.join(self.spill_dir, hashlib.sha1(repr(key).encode()).hexdigest() + ".bin")
+
+    def get(self, href, tag, fetch):
+        key = (dir_key(href), tag)
+        data = self._lookup(key)
+        metrics.record("cache.content", 0, path=key[0], hit=data is not None)
+        if data is not None:
+            return data
+        with self._lock:
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                data = self._lookup(key)
+                if data is None:
+                    data = fetch()
+                    with self._lock:
+                        spills = self._store(key, data)
+                    self._spill(spills)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return data
+
+    def _lookup(self, key):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                return self._mem[key]
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+        # 파일 읽기/쓰기는 잠금 밖에서 - 큰 파일이 다른 세션을 막지 않게
+        try:
+            with open(self._file(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+        # RAM 예산보다 큰 항목은 디스크 사본을 그대로 쓰고, 나머지는 RAM으로 승격
+        if len(data) > self.mem_budget:
+            return data
+        with self._lock:
+            if key not in self._disk:
+                return data
+            self._disk_bytes -= self._disk.pop(key)
+            spills = self._store(key, data)
+        self._remove_files([key])
+        self._spill(spills)
+        return data
+
+    def _store(self, key, data):
+        """잠금 안에서 호출: RAM에 넣고 디스크로 내릴 (키, 내용) 목록 반환"""
+        if len(data) > self.mem_budget:
+            return [(key, data)]
+        self._mem[key] = data
+        self._mem_bytes += len(data)
+        spills = []
+        while self._mem_bytes > self.mem_budget:
+            old_key, old = self._mem.popitem(last=False)
+            self._mem_bytes -= len(old)
+            spills.append((old_key, old))
+        return spills
+
+    def _spill(self, items):
+        """잠금 밖에서 호출: 디스크에 쓰고 디스크 예산을 넘으면 오래된 것부터 삭제"""
+        for key, data in items:
+            if len(data) > self.disk_budget:
+                continue
+            path = self._file(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            with self._lock:
+                self._disk_bytes += len(data) - self._disk.pop(key, 0)
+                self._disk[key] = len(data)
+                evicted = []
+                while self._disk_bytes > self.disk_budget:
+                    old_key, size = self._disk.popitem(last=False)
+                    self._disk_bytes -= size
+                    evicted.append(old_key)
+            self._remove_files(evicted)
+
+    def _remove_files(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+
+    def invalidate(self, href):
+        """해당 경로(폴더면 하위 전체)의 모든 버전 제거"""
+        key = dir_key(href)
+        prefix = key.rstrip("/") + "/"
+        with self._lock:
+            for k in [k for k in self._mem if k[0] == key or k[0].startswith(prefix)]:
+                self._mem_bytes -= len(self._mem.pop(k))
+            dropped = [k for k in self._disk if k[0] == key or k[0].startswith(prefix)]
+            for k in dropped:
+                self._disk_bytes -= self._disk.pop(k)
+        self._remove_files(dropped)
+
+@st.cache_resource
+def get_content_cache():
+    return ContentCache(
+        int(CONTENT_CACHE_MB * 1024 * 1024),
+        int(CONTENT_CACHE_DISK_MB * 1024 * 1024),
+        CONTENT_CACHE_DIR,
+    )
+
+content_cache = get_content_cache()
+
+# ── 썸네일 (백그라운드 생성, 디스크 저장) ─────────────────────
+THUMB_SIZE    = int(st.secrets.get("THUMB_SIZE", 96))
+THUMB_WORKERS = int(st.secrets.get("THUMB_WORKERS", 4))
+THUMB_DIR     = st.secrets.get(
+    "THUMB_DIR", os.path.join(tempfile.gettempdir(), "mywebdav-thumbs")
+)
+THUMB_DIR_MB  = float(st.secrets.get("THUMB_DIR_MB", 256))
+THUMB_RETRY   = float(st.secrets.get("THUMB_RETRY", 300))   # 생성 실패 후 재시도까지(초)
+THUMB_PDF_DPI = 24
+THUMB_EXTS    = IMAGE_EXTS | PDF_EXTS
+
+def make_thumbnail(data, ext):
+    """이미지/PDF 첫 페이지 → 작은 JPEG bytes"""
+    if ext in PDF_EXTS:
+        img = convert_from_bytes(data, dpi=THUMB_PDF_DPI, first_page=1, last_page=1)[0]
+    else:
+        img = Image.open(io.BytesIO(data))
+        img.draft("RGB", (THUMB_SIZE, THUMB_SIZE))   # JPEG는 축소 디코딩
+        img = ImageOps.exif_transpose(img)
+    img.thumbnail((THUMB_SIZE, THUMB_SIZE))
+    buf = io.BytesIO()
+    img.convert("RGB").save(buf, format="JPEG", quality=80)
+    return buf.getvalue()
+
+class ThumbnailStore:
+    """href + ETag 키의 썸네일 저장소 (스레드 풀에서 생성, 디스크에 영구 보관)
+
+    폴더 전체가 disk_budget을 넘으면 오래 안 쓴 것부터 지운다 (ETag가 바뀌어
+    더는 안 쓰이는 썸네일도 이렇게 정리된다). 생성에 실패한 파일은
+    retry_after초 동안 다시 시도하지 않는다.
+    """
+
+    def __init__(self, thumb_dir, workers, disk_budget, retry_after):
+        self.thumb_dir = thumb_dir
+        self.disk_budget = disk_budget
+        self.retry_after = retry_after
+        os.makedirs(thumb_dir, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumb")
+        self._pending = set()
+        self._failed = {}             # 파일 -> 실패 시각
+        self._files = OrderedDict()   # 파일 -> 크기 (오래 안 쓴 순)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        found = []
+        for f in os.listdir(thumb_dir):
+            path = os.path.join(thumb_dir, f)
+            if f.endswith(".tmp"):
+                os.remove(path)
+            elif f.endswith(".jpg"):
+                info = os.stat(path)
+                found.append((info.st_mtime, path, info.st_size))
+        for _, path, size in sorted(found):
+            self._files[path] = size
+            self._bytes += size
+        self._remove_files(self._evict())
+
+    def _file(self, href, tag):
+        digest = hashlib.sha1(f"{dir_key(href)}\0{tag}".encode()).hexdigest()
+        return os.path.join(self.thumb_dir, digest + ".jpg")
+
+    def get(self, href, tag, ext):
+        """썸네일 파일 경로 반환, 아직 없으면 생성 예약 후 None"""
+        path = self._file(href, tag)
+        with self._lock:
+            if path in self._files:
+                self._files.move_to_end(path)
+                return path
+            if path in self._pending:
+                return None
+            failed_at = self._failed.get(path)
+            if failed_at is not None and time.time() - failed_at < self.retry_after:
+                return None
+            self._failed.pop(path, None)
+            self._pending.add(path)
+        self._pool.submit(self._build, href, ext, path)
+        return None
+
+    def _build(self, href, ext, path):
+        try:
+            thumb = make_thumbnail(download_file(href), ext)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(thumb)
+            os.replace(tmp, path)
+            with self._lock:
+                self._bytes += len(thumb) - self._files.pop(path, 0)
+                self._files[path] = len(thumb)
+                evicted = self._evict()
+            self._remove_files(evicted)
+        except Exception:
+            now = time.time()
+            with self._lock:
+                for p in [p for p, t in self._failed.items() if now - t >= self.retry_after]:
+                    del self._failed[p]
+                self._failed[path] = now
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+
+    def _evict(self):
+        """잠금 안에서 호출: 예산을 넘는 만큼 오래된 파일을 목록에서 빼고 반환"""
+        evicted = []
+        while self._bytes > self.disk_budget and len(self._files) > 1:
+            old, size = self._files.popitem(last=False)
+            self._bytes -= size
+            evicted.append(old)
+        return evicted
+
+    @staticmethod
+    def _remove_files(paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+@st.cache_resource
+def get_thumbnail_store():
+    return ThumbnailStore(THUMB_DIR, THUMB_WORKERS, int(THUMB_DIR_MB * 1024 * 1024), THUMB_RETRY)
+
+thumb_store = get_thumbnail_store()
+
+# ── PDF 페이지 미리보기 (페이지 단위 렌더링 + 캐시) ───────────
+PDF_VIEW_DPI      = int(st.secrets.get("PDF_VIEW_DPI", 110))
+PDF_PAGE_CACHE_MB = float(st.secrets.get("PDF_PAGE_CACHE_MB", 128))
+PDF_DOC_FILES     = int(st.secrets.get("PDF_DOC_FILES", 8))
+PDF_PREFETCH      = 2
+PDF_COUNT_ENTRIES = 1024
+
+class PdfPageRenderer:
+    """href + ETag + 페이지 키의 렌더링 결과 캐시 (LRU, 바이트 예산)
+
+    요청한 페이지만 래스터화하고 다음 몇 페이지는 스레드 풀에서 미리
+    만들어 둔다. 진행 중인 렌더링은 Future로 공유해 중복 작업이 없다.
+    poppler에는 문서마다 한 번 써 둔 디스크 사본(최근 max_docs개)을 넘긴다.
+    """
+
+    def __init__(self, budget, workers, doc_dir, max_docs):
+        self.budget = budget
+        self.doc_dir = doc_dir
+        self.max_docs = max_docs
+        os.makedirs(doc_dir, exist_ok=True)
+        for f in os.listdir(doc_dir):
+            if f.endswith(".pdf"):
+                os.remove(os.path.join(doc_dir, f))
+        self._pages = OrderedDict()   # key -> JPEG bytes
+        self._bytes = 0
+        self._counts = OrderedDict()  # (href, tag) -> 페이지 수
+        self._docs = OrderedDict()    # (href, tag) -> 디스크 사본 경로
+        self._users = {}              # (href, tag) -> 사본을 쓰는 중인 렌더링 수
+        self._doc_locks = {}          # (href, tag) -> Lock (사본 한 번만 쓰기)
+        self._inflight = {}           # key -> Future
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdfpage")
+        self._lock = threading.Lock()
+
+    def page_count(self, href, tag, data):
+        doc = (dir_key(href), tag)
+        with self._lock:
+            if doc in self._counts:
+                self._counts.move_to_end(doc)
+                return self._counts[doc]
+        count = len(PdfReader(io.BytesIO(data)).pages)
+        with self._lock:
+            self._counts[doc] = count
+            while len(self._counts) > PDF_COUNT_ENTRIES:
+                self._counts.popitem(last=False)
+        return count
+
+    def get(self, href, tag, page, fetch):
+        """페이지 이미지 bytes (없으면 렌더링이 끝날 때까지 기다림)"""
+        return self._submit(href, tag, page, fetch).result()
+
+    def prefetch(self, href, tag, pages, fetch):
+        for page in pages:
+            self._submit(href, tag, page, fetch)
+
+    def _submit(self, href, tag, page, fetch):
+        key = (dir_key(href), tag, page)
+        with self._lock:
+            if key in self._pages:
+                self._pages.move_to_end(key)
+                done = Future()
+                done.set_result(self._pages[key])
+                return done
+            if key not in self._inflight:
+                self._inflight[key] = self._pool.submit(self._render, key, fetch)
+            return self._inflight[key]
+
+    def _doc_file(self, doc):
+        return os.path.join(self.doc_dir, hashlib.sha1(repr(doc).encode()).hexdigest() + ".pdf")
+
+    def _open_doc(self, doc, fetch):
+        """문서 디스크 사본 경로 (없으면 받아서 씀) - 끝나면 _release_doc 호출"""
+        with self._lock:
+            doc_lock = self._doc_locks.setdefault(doc, threading.Lock())
+            self._users[doc] = self._users.get(doc, 0) + 1
+        with doc_lock:
+            with self._lock:
+                if doc in self._docs:
+                    self._docs.move_to_end(doc)
+                    return self._docs[doc]
+            path = self._doc_file(doc)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(fetch())
+            os.replace(tmp, path)
+            with self._lock:
+                self._docs[doc] = path
+                while len(self._docs) > self.max_docs:
+                    old_doc, old_path = self._docs.popitem(last=False)
+                    if old_doc not in self._users:   # 쓰는 중이면 _release_doc에서 삭제
+                        self._remove(old_path)
+            return path
+
+    def _release_doc(self, doc):
+        with self._lock:
+            self._users[doc] -= 1
+            if self._users[doc]:
+                return
+            del self._users[doc]
+            self._doc_locks.pop(doc, None)
+            if doc not in self._docs:
+                # 다시 받아 쓰는 것과 겹치지 않도록 잠금 안에서 삭제
+                self._remove(self._doc_file(doc))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _render(self, key, fetch):
+        try:
+            page = key[2]
+            doc = key[:2]
+            try:
+                path = self._open_doc(doc, fetch)
+                img = convert_from_path(path, dpi=PDF_VIEW_DPI, first_page=page, last_page=page)[0]
+            finally:
+                self._release_doc(doc)
+            buf = io.BytesIO()
+            img.convert("RGB").save(buf, format="JPEG", quality=90)
+            data = buf.getvalue()
+            with self._lock:
+                self._pages[key] = data
+                self._bytes += len(data)
+                while self._bytes > self.budget and len(self._pages) > 1:
+                    _, old = self._pages.popitem(last=False)
+                    self._bytes -= len(old)
+            return data
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+@st.cache_resource
+def get_pdf_renderer():
+    return PdfPageRenderer(
+        int(PDF_PAGE_CACHE_MB * 1024 * 1024),
+        PDF_PREFETCH + 1,
+        os.path.join(CONTENT_CACHE_DIR, "pdf"),
+        PDF_DOC_FILES,
+    )
+
+pdf_renderer = get_pdf_renderer()
+
+# ── 동영상/음성 스트리밍 (HTTP Range 프록시) ──────────────────
+# MEDIA_PUBLIC_URL은 브라우저가 프록시에 닿는 주소 (HTTPS 배포면 HTTPS 리버스 프록시 주소).
+# 비어 있으면 재생/스트리밍을 끄고 동영상·음성은 일반 다운로드로만 받는다.
+MEDIA_HOST       = st.secrets.get("MEDIA_HOST", "127.0.0.1")
+MEDIA_PORT       = int(st.secrets.get("MEDIA_PORT", 8502))
+MEDIA_PUBLIC_URL = st.secrets.get("MEDIA_PUBLIC_URL", "").rstrip("/")
+MEDIA_ENABLED    = bool(MEDIA_PUBLIC_URL)
+MEDIA_BLOCK      = 1024 * 1024
+MEDIA_READAHEAD  = 2                                   # 미리 받아둘 블록 수
+MEDIA_CACHE_MB   = float(st.secrets.get("MEDIA_CACHE_MB", 64))
+MEDIA_TOKEN_TTL  = 6 * 3600
+MEDIA_TYPES = {
+    ".mp4": "video/mp4", ".webm": "video/webm", ".ogg": "video/ogg",
+    ".mp3": "audio/mpeg", ".wav": "audio/wav", ".m4a": "audio/mp4",
+}
+
+class MediaProxy:
+    """WebDAV 파일을 Range 요청 그대로 블록 단위로 중계하는 작은 HTTP 서버
+
+    플레이어가 요청한 구간의 블록만 받고, 다음 MEDIA_READAHEAD 블록은
+    미리 받아 둔다. 블록은 바이트 예산 LRU로 보관하므로 파일 전체가
+    메모리에 올라오지 않는다. URL은 등록 시 발급한 임시 토큰으로만 열린다.
+    """
+
+    def __init__(self, host, port, budget):
+        self.budget = budget
+        self._media = {}              # token -> {path, tag, size, type, name, expires}
+        self._blocks = OrderedDict()  # (path, tag, index) -> bytes
+        self._bytes = 0
+        self._inflight = {}           # key -> Future
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="media")
+        self._lock = threading.Lock()
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                proxy._serve(self, head=True)
+
+            def do_GET(self):
+                proxy._serve(self, head=False)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="media", daemon=True).start()
+
+    def register(self, path, tag, size, ext, name):
+        """재생/다운로드용 URL 발급"""
+        if size is None:
+            size = client.content_length(safe_path(path))
+        if size is None:   # 크기를 모르면 Range 응답을 만들 수 없음
+            raise RuntimeError("서버가 파일 크기를 알려주지 않습니다")
+        token = secrets.token_urlsafe(16)
+        now = time.time()
+        with self._lock:
+            for t in [t for t, m in self._media.items() if m["expires"] < now]:
+                del self._media[t]
+            self._media[token] = {
+                "path": path, "tag": tag, "size": size, "name": name,
+                "type": MEDIA_TYPES.get(ext, "application/octet-stream"),
+                "expires": now + MEDIA_TOKEN_TTL,
+            }
+        return f"{MEDIA_PUBLIC_URL}/{token}/{quote(name)}"
+
+    def _serve(self, req, head):
+        token = req.path.lstrip("/").split("/", 1)[0]
+        with self._lock:
+            media = self._media.get(token)
+        if not media or media["expires"] < time.time():
+            req.send_error(404)
+            return
+        size = media["size"]
+        start, end = 0, size - 1
+        rng = req.headers.get("Range", "")
+        partial = rng.startswith("bytes=") and "," not in rng
+        if partial:
+            first, _, last = rng[6:].partition("-")
+            try:
+                if first:
+                    start = int(first)
+                    end = min(int(last), size - 1) if last else size - 1
+                else:
+                    start = max(size - int(last), 0)   # "bytes=-"도 ValueError
+            except ValueError:
+                start, end = size, 0                   # 형식이 잘못된 Range도 416
+            if start >= size or start > end:
+                req.send_response(416)
+                req.send_header("Content-Range", f"bytes */{size}")
+                req.end_headers()
+                return
+        # 첫 블록은 응답을 시작하기 전에 받아 둠 - 실패하면 아직 502로 응답할 수 있음
+        block = None
+        if not head and start <= end:
+            try:
+                block = self._block(media, start // MEDIA_BLOCK).result()
+            except Exception as e:
+                req.send_error(502, explain=f"{type(e).__name__}: {e}")
+                return
+        if partial:
+            req.send_response(206)
+            req.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            req.send_response(200)
+        req.send_header("Accept-Ranges", "bytes")
+        req.send_header("Content-Type", media["type"])
+        req.send_header("Content-Length", str(end - start + 1))
+        if "download=1" in req.path:
+            req.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(media['name'])}")
+        req.end_headers()
+        if head:
+            return
+        try:
+            pos = start
+            while pos <= end:
+                index = pos // MEDIA_BLOCK
+                if block is None:
+                    block = self._block(media, index).result()
+                self._readahead(media, index)
+                offset = pos - index * MEDIA_BLOCK
+                chunk = block[offset:offset + end - pos + 1]
+                req.wfile.write(chunk)
+                pos += len(chunk)
+                block = None
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # 탐색/정지로 플레이어가 연결을 끊음
+        except Exception:
+            # 헤더를 보낸 뒤라 오류 응답은 못 보냄 - 연결을 끊어 응답이 잘렸음을 알림
+            # (블록 오류 자체는 _fetch의 timed가 지표에 남김)
+            req.close_connection = True
+
+    def _readahead(self, media, index):
+        last = (media["size"] - 1) // MEDIA_BLOCK
+        for i in range(index + 1, min(index + MEDIA_READAHEAD, last) + 1):
+            self._block(media, i)
+
+    def _block(self, media, index):
+        key = (dir_key(media["path"]), media["tag"], index)
+        with self._lock:
+            if key in self._blocks:
+                self._blocks.move_to_end(key)
+                done = Future()
+                done.set_result(self._blocks[key])
+                return done
+            if key not in self._inflight:
+                self._inflight[key] = self._pool.submit(self._fetch, key, media, index)
+            return self._inflight[key]
+
+    def _fetch(self, key, media, index):
+        try:
+            first = index * MEDIA_BLOCK
+            last = min(first + MEDIA_BLOCK, media["size"]) - 1
+            with timed("range", media["path"]) as m:
+                resp = client.request(
+                    "GET", safe_path(media["path"]), headers={"Range": f"bytes={first}-{last}"}
+                )
+                if resp.status_code != 206:
+                    raise RuntimeError(f"Range 요청 미지원 (HTTP {resp.status_code})")
+                data = resp.content
+                m["bytes"] = len(data)
+            with self._lock:
+                self._blocks[key] = data
+                self._bytes += len(data)
+                while self._bytes > self.budget and len(self._blocks) > 1:
+                    _, old = self._blocks.popitem(last=False)
+                    self._bytes -= len(old)
+            return data
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+# 첫 재생 때 띄운다 - 포트를 못 열어도(OSError) 파일 탐색은 그대로 동작
+@st.cache_resource
+def get_media_proxy():
+    return MediaProxy(MEDIA_HOST, MEDIA_PORT, int(MEDIA_CACHE_MB * 1024 * 1024))
+
 # ── 세션 초기화 ──────────────────────────────────────────────
 ROOT_PATH = st.secrets.get("WEBDAV_ROOT", "/")
+PAGE_SIZE = int(st.secrets.get("PAGE_SIZE", 50))
+PAGE_SIZE_OPTIONS = sorted({25, 50, 100, 200, PAGE_SIZE})
 
 for key, default in [
     ("path_stack", [ROOT_PATH]),
     ("preview", None),
+    ("download", None),
     ("sort_by", "이름"),
     ("sort_asc", True),
+    ("show_thumbs", True),
+    ("name_filter", ""),
+    ("page", 0),
+    ("page_size", PAGE_SIZE),
     ("delete_confirm", None),
     ("refresh_counter", 0),
+    ("upload_counter", 0),
+    ("selected", {}),
+    ("bulk_delete_confirm", False),
+    ("bulk_zip", None),
 ]:
     if key not in st.session_state:
         st.session_state[key] = default
@@ -108,18 +980,402 @@ def navigate_to(path):
     else:
         st.session_state["path_stack"].append(path)
     st.session_state["preview"] = None
+    st.session_state["download"] = None
     st.session_state["delete_confirm"] = None
+    st.session_state["name_filter"] = ""
+    st.session_state["page"] = 0
+    st.session_state["selected"] = {}
+    st.session_state["bulk_delete_confirm"] = False
 
 def do_refresh():
+    listing_cache.invalidate(current_path())
     st.session_state["refresh_counter"] += 1
     st.session_state["delete_confirm"] = None
 
+def item_path_of(item, parent):
+    """목록 항목의 WebDAV 경로 (폴더는 끝에 / 붙임)"""
+    href = item.get("href", "")
+    path = href if href.startswith("/") else os.path.join(parent, item["name"])
+    if item["type"] == "directory" and not path.endswith("/"):
+        path += "/"
+    return path
+
+DOWNLOAD_CHUNK = 1024 * 1024
+
+class ChunkSink:
+    """download_fileobj 대상 - 받은 청크를 모아 두었다가 끝에 한 번만 이어 붙임
+
+    BytesIO는 자라면서 버퍼를 다시 잡고 getvalue()로 또 복사하지만,
+    여기서는 청크를 그대로 들고 있다가 join 한 번으로 끝낸다.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, chunk):
+        self.chunks.append(bytes(chunk))
+        self.size += len(chunk)
+        return len(chunk)
+
+    def getvalue(self):
+        data = b"".join(self.chunks)
+        self.chunks = [data]
+        return data
+
 def download_file(item_path):
-    """파일 다운로드 - URL 디코딩된 경로 사용"""
-    buf = io.BytesIO()
-    client.download_fileobj(safe_path(item_path), buf)
-    buf.seek(0)
-    return buf.getvalue()
+    """파일 다운로드 - URL 디코딩된 경로 사용 (청크 단위 스트리밍)"""
+    sink = ChunkSink()
+    with timed("download", item_path) as m:
+        client.download_fileobj(safe_path(item_path), sink, chunk_size=DOWNLOAD_CHUNK)
+        m["bytes"] = sink.size
+    return sink.getvalue()
+
+def remove_path(item_path):
+    with timed("remove", item_path):
+        client.remove(safe_path(item_path))
+
+def get_file(item_path, tag):
+    """캐시를 거쳐 파일 내용 반환 (없을 때만 WebDAV에서 받음)"""
+    return content_cache.get(item_path, tag, lambda: download_file(item_path))
+
+# ── 업로드 (청크 스트리밍, 병렬) ──────────────────────────────
+UPLOAD_WORKERS = int(st.secrets.get("UPLOAD_WORKERS", 4))
+UPLOAD_CHUNK   = DOWNLOAD_CHUNK
+
+class UploadProgress:
+    """파일별 전송 바이트 집계 (워커 스레드 → 메인 스레드)"""
+
+    def __init__(self, files):
+        self.sent = {f.name: 0 for f in files}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def callback(self, name):
+        def on_chunk(n):
+            with self._lock:
+                self.sent[name] += n
+        return on_chunk
+
+    def fail(self, name, error):
+        with self._lock:
+            self.errors[name] = error
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.sent), dict(self.errors)
+
+def upload_one(f, dest_dir, overwrite, progress):
+    """파일 하나를 청크 단위로 PUT (전체를 한 번에 버퍼링하지 않음)"""
+    to_path = posixpath.join(safe_path(dest_dir), f.name)
+    try:
+        f.seek(0)
+        with timed("upload", to_path) as m:
+            client.upload_fileobj(
+                f, to_path,
+                overwrite=overwrite,
+                chunk_size=UPLOAD_CHUNK,
+                callback=progress.callback(f.name),
+            )
+            m["bytes"] = f.size
+        content_cache.invalidate(to_path)
+    except Exception as e:
+        progress.fail(f.name, e)
+
+def upload_files(files, dest_dir, overwrite, on_progress):
+    """스레드 풀로 여러 파일 동시 업로드 (클라이언트의 HTTP 연결 풀 공유)
+
+    on_progress(sent, errors)는 메인 스레드에서 주기적으로 호출된다.
+    """
+    progress = UploadProgress(files)
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="upload") as pool:
+        futures = [pool.submit(upload_one, f, dest_dir, overwrite, progress) for f in files]
+        while not all(fut.done() for fut in futures):
+            on_progress(*progress.snapshot())
+            time.sleep(0.2)
+    on_progress(*progress.snapshot())
+    listing_cache.invalidate(dest_dir)
+    return progress
+
+# ── 다중 선택 (ZIP 묶음 다운로드 / 일괄 삭제) ──────────────────
+BULK_WORKERS   = int(st.secrets.get("BULK_WORKERS", 8))
+ZIP_SPOOL_MB   = float(st.secrets.get("ZIP_SPOOL_MB", 64))
+ZIP_STORE_EXTS = IMAGE_EXTS | PDF_EXTS | VIDEO_EXTS | AUDIO_EXTS   # 이미 압축된 형식
+
+def toggle_selected(path, entry):
+    selected = st.session_state["selected"]
+    if path in selected:
+        del selected[path]
+    else:
+        selected[path] = entry
+
+def walk_files(path, arcname):
+    """선택 항목 → (경로, ZIP 내 이름, 태그) 목록 (폴더는 하위까지 재귀)"""
+    for item in listing_cache.get(path):
+        child = item_path_of(item, path)
+        name  = os.path.basename(unquote(item["name"]).rstrip("/"))
+        if item["type"] == "directory":
+            yield from walk_files(child, f"{arcname}/{name}")
+        else:
+            yield child, f"{arcname}/{name}", item_tag(item)
+
+def build_zip(selected, on_progress):
+    """선택 파일을 병렬로 받아 스풀 임시 파일에 ZIP으로 차례로 기록
+
+    ZIP_SPOOL_MB를 넘으면 디스크로 넘어가므로 전체를 RAM에 들고 있지 않는다.
+    """
+    files = []
+    for path, entry in selected.items():
+        if entry["is_dir"]:
+            files.extend(walk_files(path, entry["name"]))
+        else:
+            files.append((path, entry["name"], entry["tag"]))
+
+    spool = tempfile.SpooledTemporaryFile(max_size=int(ZIP_SPOOL_MB * 1024 * 1024))
+    errors = {}
+    done = 0
+
+    def write_done(finished):
+        nonlocal done
+        for fut in finished:
+            path, arcname = pending.pop(fut)
+            try:
+                data = fut.result()
+            except Exception as e:
+                errors[arcname] = e
+            else:
+                ext = os.path.splitext(arcname)[1].lower()
+                compress = zipfile.ZIP_STORED if ext in ZIP_STORE_EXTS else zipfile.ZIP_DEFLATED
+                zf.writestr(arcname, data, compress_type=compress)
+            done += 1
+            on_progress(done, len(files))
+
+    # 받는 중 + 받아 두고 아직 못 쓴 파일은 워커 수의 2배까지만 - 쓰고 나면 바로 놓음
+    with zipfile.ZipFile(spool, "w", zipfile.ZIP_DEFLATED) as zf, \
+            ThreadPoolExecutor(max_workers=BULK_WORKERS, thread_name_prefix="bulk") as pool:
+        pending = {}   # Future -> (경로, ZIP 내 이름)
+        for path, arcname, _ in files:
+            pending[pool.submit(download_file, path)] = (path, arcname)
+            if len(pending) >= BULK_WORKERS * 2:
+                write_done(wait(pending, return_when=FIRST_COMPLETED).done)
+        while pending:
+            write_done(wait(pending, return_when=FIRST_COMPLETED).done)
+    spool.seek(0)
+    return spool, len(files) - len(errors), errors
+
+def remove_many(paths):
+    """remove_path를 병렬로 호출, 끝난 뒤 목록 캐시는 한 번만 무효화"""
+    errors = {}
+    with ThreadPoolExecutor(max_workers=BULK_WORKERS, thread_name_prefix="bulk") as pool:
+        futures = {pool.submit(remove_path, p): p for p in paths}
+        for fut in as_completed(futures):
+            try:
+                fut.result()
+            except Exception as e:
+                errors[futures[fut]] = e
+    listing_cache.invalidate(current_path())
+    for p in paths:
+        if p.endswith("/"):
+            listing_cache.invalidate(p, recursive=True)
+        content_cache.invalidate(p)
+    return errors
+
+# ── 전체 색인 (백그라운드 크롤링, SQLite) ─────────────────────
+INDEX_DB       = st.secrets.get(
+    "INDEX_DB", os.path.join(tempfile.gettempdir(), "mywebdav-index.sqlite3")
+)
+INDEX_WORKERS  = int(st.secrets.get("INDEX_WORKERS", 8))
+INDEX_INTERVAL = float(st.secrets.get("INDEX_INTERVAL", 600))
+SEARCH_LIMIT   = 200
+
+class SearchIndex:
+    """WEBDAV_ROOT 아래 전체 항목 색인 (파일명 검색 + 폴더 크기 합계)
+
+    백그라운드 스레드가 INDEX_INTERVAL마다 트리를 훑는다. 이미 색인된
+    폴더는 Depth 0 PROPFIND로 검증값만 비교해, 바뀐 폴더만 다시 읽는다.
+    """
+
+    def __init__(self, db_path, root, workers, interval):
+        self.db_path = db_path
+        self.root = root
+        self.workers = workers
+        self.interval = interval
+        self.status = {"running": False, "crawled_at": None, "listed": 0, "error": None}
+        self._wake = threading.Event()
+        with self._connect() as db:
+            db.executescript("""
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS entries (
+                    path TEXT PRIMARY KEY, parent TEXT, name TEXT,
+                    is_dir INTEGER, size INTEGER, modified TEXT
+                );
+                CREATE INDEX IF NOT EXISTS entries_parent ON entries(parent);
+                CREATE TABLE IF NOT EXISTS collections (
+                    path TEXT PRIMARY KEY, validator TEXT, total_size INTEGER
+                );
+            """)
+        if interval > 0:   # 0 이하면 크롤러 끔 (벤치마크 등)
+            threading.Thread(target=self._loop, name="indexer", daemon=True).start()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _loop(self):
+        while True:
+            self.status["running"] = True
+            try:
+                self.crawl()
+                self.status["error"] = None
+            except Exception as e:
+                self.status["error"] = e
+            self.status["running"] = False
+            self.status["crawled_at"] = time.time()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def request_crawl(self):
+        self._wake.set()
+
+    def _visit(self, path, stored):
+        """폴더 하나 처리 → (검증값, 하위 항목 or None=변경 없음)"""
+        key = dir_key(path)
+        if key in stored:
+            validator = propfind_validator(path, "index.")
+            if validator is not None and repr(validator) == stored[key]:
+                return validator, None
+        return propfind_listing(path, "index.")
+
+    def crawl(self):
+        with self._connect() as db:
+            stored = dict(db.execute("SELECT path, validator FROM collections"))
+        seen, listed = set(), 0
+        frontier = [self.root]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="index") as pool:
+            while frontier:
+                futures = {pool.submit(self._visit, p, stored): p for p in frontier}
+                frontier = []
+                for fut in as_completed(futures):
+                    path = futures[fut]
+                    key = dir_key(path)
+                    seen.add(key)
+                    try:
+                        validator, items = fut.result()
+                    except Exception:
+                        if key in stored:   # 일시 오류: 이전 색인 유지
+                            frontier.extend(self._stored_subdirs(key))
+                        continue
+                    if items is None:
+                        frontier.extend(self._stored_subdirs(key))
+                        continue
+                    listed += 1
+                    frontier.extend(self._store_listing(key, path, validator, items))
+        with self._connect() as db:
+            gone = [k for k in stored if k not in seen]
+            for k in gone:
+                db.execute("DELETE FROM collections WHERE path = ?", (k,))
+                db.execute("DELETE FROM entries WHERE path = ? OR parent = ?", (k, k))
+        self._update_sizes()
+        self.status["listed"] = listed
+
+    def _stored_subdirs(self, key):
+        with self._connect() as db:
+            return [p + "/" for (p,) in db.execute(
+                "SELECT path FROM entries WHERE parent = ? AND is_dir = 1", (key,)
+            )]
+
+    def _store_listing(self, key, path, validator, items):
+        rows, subdirs = [], []
+        for item in items:
+            child = item_path_of(item, path)
+            is_dir = item["type"] == "directory"
+            if is_dir:
+                subdirs.append(child)
+            rows.append((
+                dir_key(child), key,
+                os.path.basename(unquote(item["name"]).rstrip("/")),
+                int(is_dir),
+                None if is_dir else item.get("content_length"),
+                str(item.get("modified") or item.get("last_modified") or ""),
+            ))
+        current = {r[0] for r in rows}
+        with self._connect() as db:
+            # 사라진 하위 폴더는 그 아래 항목까지 정리
+            for (old,) in db.execute(
+                "SELECT path FROM entries WHERE parent = ? AND is_dir = 1", (key,)
+            ).fetchall():
+                if old not in current:
+                    prefix = old + "/"
+                    db.execute("DELETE FROM entries WHERE path = ? OR substr(path, 1, ?) = ?",
+                               (old, len(prefix), prefix))
+                    db.execute("DELETE FROM collections WHERE path = ? OR substr(path, 1, ?) = ?",
+                               (old, len(prefix), prefix))
+            db.execute("DELETE FROM entries WHERE parent = ?", (key,))
+            db.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", rows)
+            db.execute(
+                "INSERT OR REPLACE INTO collections (path, validator) VALUES (?, ?)",
+                (key, repr(validator) if validator is not None else None),
+            )
+        return subdirs
+
+    def _update_sizes(self):
+        """파일 크기를 모든 상위 폴더에 더해 폴더별 합계 갱신"""
+        with self._connect() as db:
+            parents = dict(db.execute("SELECT path, parent FROM entries WHERE is_dir = 1"))
+            totals = {k: 0 for (k,) in db.execute("SELECT path FROM collections")}
+            for parent, size in db.execute(
+                "SELECT parent, size FROM entries WHERE is_dir = 0 AND size IS NOT NULL"
+            ):
+                while parent is not None:
+                    if parent in totals:
+                        totals[parent] += size
+                    parent = parents.get(parent)
+            db.executemany(
+                "UPDATE collections SET total_size = ? WHERE path = ?",
+                [(v, k) for k, v in totals.items()],
+            )
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._connect() as db:
+            return db.execute(
+                "SELECT path, parent, name, is_dir, size FROM entries "
+                "WHERE name LIKE ? ESCAPE '\\' ORDER BY is_dir DESC, name LIMIT ?",
+                (pattern, limit),
+            ).fetchall()
+
+    def folder_sizes(self, paths):
+        keys = [dir_key(p) for p in paths]
+        if not keys:
+            return {}
+        with self._connect() as db:
+            rows = db.execute(
+                f"SELECT path, total_size FROM collections WHERE path IN ({','.join('?' * len(keys))})",
+                keys,
+            ).fetchall()
+        return {k: v for k, v in rows if v is not None}
+
+    def ancestors(self, key):
+        """색인 경로 → 루트부터의 폴더 경로 목록 (path_stack용)"""
+        chain = []
+        root = dir_key(self.root)
+        with self._connect() as db:
+            while key and key != root:
+                chain.append(key + "/")
+                row = db.execute("SELECT parent FROM entries WHERE path = ?", (key,)).fetchone()
+                key = row[0] if row else None
+        return list(reversed(chain))
+
+@st.cache_resource
+def get_search_index():
+    return SearchIndex(INDEX_DB, ROOT_PATH, INDEX_WORKERS, INDEX_INTERVAL)
+
+search_index = get_search_index()
+
+def open_folder(key, name_filter=""):
+    """색인 경로의 폴더로 바로 이동 (브레드크럼도 같이 구성)"""
+    navigate_to(ROOT_PATH)
+    st.session_state["path_stack"] = [ROOT_PATH] + search_index.ancestors(key)
+    st.session_state["name_filter"] = name_filter
 
 # ── 사이드바 ─────────────────────────────────────────────────
 with st.sidebar:
@@ -127,36 +1383,213 @@ with st.sidebar:
     st.caption(st.secrets.get("WEBDAV_URL", ""))
     st.divider()
 
+    query = st.text_input("전체 검색", placeholder="🔎 파일명 검색 (전체)")
+    idx = search_index.status
+    if idx["running"]:
+        st.caption("⏳ 색인 중...")
+    elif idx["crawled_at"]:
+        st.caption(f"색인 {time.strftime('%H:%M', time.localtime(idx['crawled_at']))} · 폴더 {idx['listed']}개 갱신")
+    if idx["error"]:
+        st.caption(f"⚠️ 색인 오류: {idx['error']}")
+    if st.button("🔁 다시 색인", disabled=idx["running"], use_container_width=True):
+        search_index.request_crawl()
+        rerun_run()
+    if query.strip():
+        results = search_index.search(query.strip())
+        if not results:
+            st.caption("검색 결과 없음")
+        for path, parent, name, is_dir, size in results:
+            r1, r2 = st.columns([4, 1])
+            r1.markdown(f"{'📁' if is_dir else '📎'} **{name}**  \n`{parent}`" + ("" if is_dir else f" · {fmt_size(size)}"))
+            if r2.button("→", key=f"hit_{path}", help="열기"):
+                if is_dir:
+                    open_folder(path)
+                else:
+                    open_folder(parent, name_filter=name)
+                rerun_run()
+        if len(results) == SEARCH_LIMIT:
+            st.caption(f"상위 {SEARCH_LIMIT}개만 표시")
+    st.divider()
+
     if st.session_state["preview"]:
         pv = st.session_state["preview"]
         ext = pv["ext"]
         st.subheader(f"🔎 {pv['name']}")
+        is_media = MEDIA_ENABLED and ext in VIDEO_EXTS | AUDIO_EXTS
+        pv_data = b""
+        if not is_media:
+            try:
+                pv_data = get_file(pv["path"], pv["tag"])
+            except Exception as e:
+                st.error(f"미리보기 실패: {e}")
 
-        if ext in IMAGE_EXTS:
-            st.image(pv["data"], use_container_width=True)
-        elif ext in PDF_EXTS:
-            b64 = base64.b64encode(pv["data"]).decode()
-            st.markdown(
-                f'<iframe src="data:application/pdf;base64,{b64}" '
-                f'width="100%" height="600px"></iframe>',
-                unsafe_allow_html=True,
-            )
+        if is_media:
+            try:
+                media_proxy = get_media_proxy()
+            except OSError as e:
+                st.warning(f"재생 불가: 스트리밍 포트 {MEDIA_HOST}:{MEDIA_PORT}를 열 수 없습니다 ({e})")
+            else:
+                try:
+                    if "url" not in pv:
+                        pv["url"] = media_proxy.register(pv["path"], pv["tag"], pv.get("size"), ext, pv["name"])
+                    if ext in VIDEO_EXTS:
+                        st.video(pv["url"])
+                    else:
+                        st.audio(pv["url"])
+                    st.link_button("⬇️ 다운로드", f"{pv['url']}?download=1", use_container_width=True)
+                except Exception as e:
+                    st.error(f"재생 실패: {e}")
+        elif ext in IMAGE_EXTS:
+            st.image(pv_data, use_container_width=True)
+        elif ext in PDF_EXTS and pv_data:
+            fetch_pdf = lambda: get_file(pv["path"], pv["tag"])
+            try:
+                n_pages = pdf_renderer.page_count(pv["path"], pv["tag"], pv_data)
+                page = min(max(pv.get("page", 1), 1), n_pages)
+                g1, g2, g3 = st.columns([1, 2, 1])
+                with g1:
+                    if st.button("◀", key="pdf_prev", disabled=page <= 1, use_container_width=True):
+                        pv["page"] = page - 1
+                        rerun_run()
+                with g2:
+                    new_page = st.number_input(
+                        "페이지", min_value=1, max_value=n_pages, value=page,
+                        key=f"pdf_page_{page}", label_visibility="collapsed",
+                    )
+                    if new_page != page:
+                        pv["page"] = new_page
+                        rerun_run()
+                with g3:
+                    if st.button("▶", key="pdf_next", disabled=page >= n_pages, use_container_width=True):
+                        pv["page"] = page + 1
+                        rerun_run()
+                st.caption(f"{page} / {n_pages} 페이지")
+                with st.spinner("페이지 렌더링 중..."):
+                    page_img = pdf_renderer.get(pv["path"], pv["tag"], page, fetch_pdf)
+                st.image(page_img, use_container_width=True)
+                pdf_renderer.prefetch(
+                    pv["path"], pv["tag"],
+                    range(page + 1, min(page + PDF_PREFETCH, n_pages) + 1),
+                    fetch_pdf,
+                )
+            except Exception as e:
+                st.error(f"PDF 미리보기 실패: {e}")
 
-        st.download_button(
-            "⬇️ 다운로드",
-            data=pv["data"],
-            file_name=pv["name"],
-            use_container_width=True,
-            key="sidebar_dl",
-        )
+        # 저장 버튼의 데이터는 매 실행마다 해시·전송되므로, 준비를 누른 실행에서만 붙임
+        if not is_media and pv.get("ready") and pv_data:
+            st.download_button(
+                "💾 저장",
+                data=pv_data,
+                file_name=pv["name"],
+                use_container_width=True,
+                type="primary",
+                key="sidebar_dl",
+                on_click=lambda: pv.update(ready=False),
+            )
+        elif not is_media and st.button("⬇️ 다운로드", key="prepare_pv_dl", use_container_width=True):
+            pv["ready"] = True
+            rerun_run()
         if st.button("✖️ 닫기", use_container_width=True):
             st.session_state["preview"] = None
-            st.rerun()
+            rerun_run()
+
+    if st.session_state["download"]:
+        dl = st.session_state["download"]
+        st.subheader(f"⬇️ {dl['name']}")
+        st.caption(fmt_size(dl["size"]))
+        # 파일 읽기는 저장 준비를 누른 실행에서만 (ZIP과 같은 두 단계)
+        if dl.get("ready"):
+            try:
+                dl_data = get_file(dl["path"], dl["tag"])
+            except Exception as e:
+                st.error(f"다운로드 실패: {e}")
+                dl["ready"] = False
+            else:
+                st.download_button(
+                    "💾 저장",
+                    data=dl_data,
+                    file_name=dl["name"],
+                    use_container_width=True,
+                    type="primary",
+                    key="sidebar_file_dl",
+                    on_click=lambda: dl.update(ready=False),
+                )
+        elif st.button("⬇️ 저장 준비", key="prepare_dl", use_container_width=True):
+            dl["ready"] = True
+            rerun_run()
+        if st.button("✖️ 닫기", key="close_dl", use_container_width=True):
+            st.session_state["download"] = None
+            rerun_run()
+
+    if st.session_state["bulk_zip"]:
+        bz = st.session_state["bulk_zip"]
+        st.subheader(f"📦 {bz['name']}")
+        st.caption(f"파일 {bz['count']}개 · {fmt_size(bz['size'])}")
+        # 스풀 파일은 download_button이 받지 않으므로, 저장을 누를 때만 한 번 읽어 전송
+        if bz.get("ready"):
+            bz["file"].seek(0)
+            st.download_button(
+                "💾 저장",
+                data=bz["file"].read(),
+                file_name=bz["name"],
+                mime="application/zip",
+                use_container_width=True,
+                type="primary",
+                key="sidebar_zip_dl",
+                on_click=lambda: bz.update(ready=False),
+            )
+        elif st.button("⬇️ ZIP 준비", key="prepare_zip", use_container_width=True):
+            bz["ready"] = True
+            rerun_run()
+        if st.button("✖️ 닫기", key="close_zip", use_container_width=True):
+            bz["file"].close()
+            st.session_state["bulk_zip"] = None
+            rerun_run()
+
+    if st.secrets.get("METRICS_PANEL", True):
+        with st.expander("📊 성능 지표"):
+            stats = metrics.summary()
+            if not stats:
+                st.caption("아직 기록 없음")
+            rows = []
+            for op, stat in sorted(stats.items()):
+                hit_total = stat["hits"] + stat["misses"]
+                rows.append({
+                    "작업": op,
+                    "호출": stat["count"],
+                    "평균 ms": round(stat["ms"] / stat["count"], 1),
+                    "p50 ≤": Metrics.percentile(stat["hist"], 0.5),
+                    "p95 ≤": Metrics.percentile(stat["hist"], 0.95),
+                    "p99 ≤": Metrics.percentile(stat["hist"], 0.99),
+                    "전송": fmt_size(stat["bytes"]) if stat["bytes"] else "—",
+                    "적중률": f"{stat['hits'] / hit_total:.0%}" if hit_total else "—",
+                    "오류": stat["errors"],
+                })
+            if rows:
+                st.dataframe(rows, hide_index=True, use_container_width=True)
+            hot = metrics.hot_folders()
+            if hot:
+                st.caption("PROPFIND 시간이 많은 폴더")
+                st.dataframe(
+                    [{"폴더": p, "횟수": n, "총 ms": round(t)} for p, n, t in hot],
+                    hide_index=True, use_container_width=True,
+                )
+            m1, m2 = st.columns(2)
+            m1.download_button(
+                "JSONL 내보내기",
+                data=metrics.export_jsonl(),
+                file_name="mywebdav-metrics.jsonl",
+                mime="application/jsonl",
+                use_container_width=True,
+            )
+            if m2.button("초기화", key="metrics_reset", use_container_width=True):
+                metrics.reset()
+                rerun_run()
 
     st.divider()
     if st.button("🚪 로그아웃", use_container_width=True):
         st.session_state.clear()
-        st.rerun()
+        rerun_run()
 
 # ── 메인 ─────────────────────────────────────────────────────
 st.title("🗂️ 파일 브라우저")
@@ -172,18 +1605,18 @@ with nav_cols[0]:
             if i < len(crumbs) - 1:
                 if st.button(label, key=f"crumb_{i}"):
                     navigate_to(crumb)
-                    st.rerun()
+                    rerun_run()
             else:
                 st.markdown(f"**{label}**")
 with nav_cols[1]:
     if st.button("🔄", help="새로고침", use_container_width=True):
         do_refresh()
-        st.rerun()
+        rerun_run()
 
 st.divider()
 
 # 정렬 옵션
-s1, s2, _ = st.columns([2, 2, 6])
+s1, s2, s3, s4 = st.columns([2, 2, 2, 4])
 with s1:
     st.session_state["sort_by"] = st.selectbox(
         "정렬",
@@ -195,17 +1628,70 @@ with s2:
     asc_label = "⬆️ 오름차순" if st.session_state["sort_asc"] else "⬇️ 내림차순"
     if st.button(asc_label, use_container_width=True):
         st.session_state["sort_asc"] = not st.session_state["sort_asc"]
-        st.rerun()
+        rerun_run()
+with s3:
+    st.session_state["show_thumbs"] = st.toggle("🖼️ 썸네일", value=st.session_state["show_thumbs"])
+with s4:
+    name_filter = st.text_input(
+        "이름 필터",
+        value=st.session_state["name_filter"],
+        placeholder="🔍 이름 필터",
+        label_visibility="collapsed",
+    )
+    if name_filter != st.session_state["name_filter"]:
+        st.session_state["name_filter"] = name_filter
+        st.session_state["page"] = 0
+
+# ── 업로드 ───────────────────────────────────────────────────
+with st.expander("📤 업로드"):
+    uploads = st.file_uploader(
+        "파일 선택",
+        accept_multiple_files=True,
+        key=f"uploader_{st.session_state['upload_counter']}",
+        label_visibility="collapsed",
+    )
+    u1, u2 = st.columns([1, 3])
+    with u1:
+        overwrite = st.checkbox("같은 이름 덮어쓰기")
+    with u2:
+        start_upload = st.button(
+            f"📤 {len(uploads)}개 파일 업로드" if uploads else "📤 업로드",
+            disabled=not uploads,
+            type="primary",
+            use_container_width=True,
+        )
+    if start_upload:
+        sizes = {f.name: f.size for f in uploads}
+        total_bytes = sum(sizes.values()) or 1
+        overall = st.progress(0.0, text="전체 진행률")
+        bars = {f.name: st.progress(0.0, text=f.name) for f in uploads}
+
+        def show_progress(sent, errors):
+            for name, bar in bars.items():
+                size = sizes[name] or 1
+                mark = "❌ " if name in errors else ""
+                bar.progress(min(sent[name] / size, 1.0), text=f"{mark}{name} ({fmt_size(sent[name])} / {fmt_size(size)})")
+            done = sum(sent.values())
+            overall.progress(min(done / total_bytes, 1.0), text=f"전체 {fmt_size(done)} / {fmt_size(total_bytes)}")
+
+        result = upload_files(uploads, current_path(), overwrite, show_progress)
+        if result.errors:
+            for name, err in result.errors.items():
+                st.error(f"업로드 실패: {name} - {err}")
+        else:
+            st.session_state["upload_counter"] += 1
+            st.session_state["refresh_counter"] += 1
+            rerun_run()
 
 # ── 목록 불러오기 ─────────────────────────────────────────────
 _ = st.session_state["refresh_counter"]
 
 try:
     with st.spinner("목록 불러오는 중..."):
-        items = client.ls(safe_path(current_path()), detail=True)
+        items = listing_cache.get(current_path())
 except Exception as e:
     st.error(f"❌ 목록 불러오기 실패: {e}")
-    st.stop()
+    stop_run(type(e).__name__)
 
 def sort_key(item):
     sb = st.session_state["sort_by"]
@@ -218,41 +1704,145 @@ def sort_key(item):
         return item.get("content_length") or 0
     return ""
 
+if not items:
+    st.info("📭 폴더가 비어 있습니다.")
+    stop_run()
+
+needle = st.session_state["name_filter"].strip().lower()
+if needle:
+    items = [i for i in items if needle in unquote(os.path.basename((i["name"] or "").rstrip("/"))).lower()]
+
 dirs  = sorted([i for i in items if i["type"] == "directory"],  key=sort_key, reverse=not st.session_state["sort_asc"])
 files = sorted([i for i in items if i["type"] != "directory"],  key=sort_key, reverse=not st.session_state["sort_asc"])
 all_items = dirs + files
 
 if not all_items:
-    st.info("📭 폴더가 비어 있습니다.")
-    st.stop()
+    st.info(f"🔍 '{st.session_state['name_filter']}' 과(와) 일치하는 항목이 없습니다.")
+    stop_run()
+
+# ── 페이지 나누기 (보이는 구간만 렌더링) ──────────────────────
+page_size  = st.session_state["page_size"]
+page_count = (len(all_items) + page_size - 1) // page_size
+page       = min(st.session_state["page"], page_count - 1)
+start      = page * page_size
+page_items = all_items[start:start + page_size]
+folder_sizes = search_index.folder_sizes(
+    [item_path_of(i, current_path()) for i in page_items if i["type"] == "directory"]
+)
+
+p1, p2, p3, p4 = st.columns([1, 4, 1, 2])
+with p1:
+    if st.button("◀ 이전", disabled=page == 0, use_container_width=True):
+        st.session_state["page"] = page - 1
+        rerun_run()
+with p2:
+    st.caption(f"{start + 1}–{start + len(page_items)} / 전체 {len(all_items)}개 ({page + 1}/{page_count} 페이지)")
+with p3:
+    if st.button("다음 ▶", disabled=page >= page_count - 1, use_container_width=True):
+        st.session_state["page"] = page + 1
+        rerun_run()
+with p4:
+    new_size = st.selectbox(
+        "페이지 크기",
+        PAGE_SIZE_OPTIONS,
+        index=PAGE_SIZE_OPTIONS.index(page_size) if page_size in PAGE_SIZE_OPTIONS else 0,
+        format_func=lambda n: f"{n}개씩 보기",
+        label_visibility="collapsed",
+    )
+    if new_size != page_size:
+        st.session_state["page_size"] = new_size
+        st.session_state["page"] = start // new_size
+        rerun_run()
+
+# ── 다중 선택 ────────────────────────────────────────────────
+selected = st.session_state["selected"]
+b1, b2, b3, b4, b5 = st.columns([2, 1.5, 1.5, 2, 2])
+b1.caption(f"☑️ {len(selected)}개 선택됨")
+with b2:
+    if st.button("전체 선택", use_container_width=True):
+        for item in all_items:
+            path = item_path_of(item, current_path())
+            selected[path] = {
+                "name": os.path.basename(unquote(item["name"]).rstrip("/")),
+                "is_dir": item["type"] == "directory",
+                "tag": item_tag(item),
+            }
+        rerun_run()
+with b3:
+    if st.button("선택 해제", disabled=not selected, use_container_width=True):
+        selected.clear()
+        rerun_run()
+with b4:
+    if st.button("📦 ZIP 다운로드", disabled=not selected, use_container_width=True):
+        zip_bar = st.progress(0.0, text="ZIP 만드는 중...")
+        try:
+            spool, count, errors = build_zip(
+                selected,
+                lambda done, total: zip_bar.progress(done / total, text=f"ZIP 만드는 중... {done}/{total}"),
+            )
+        except Exception as e:
+            st.error(f"ZIP 만들기 실패: {e}")
+        else:
+            for name, err in errors.items():
+                st.error(f"받기 실패: {name} - {err}")
+            if st.session_state["bulk_zip"]:
+                st.session_state["bulk_zip"]["file"].close()
+            spool.seek(0, os.SEEK_END)
+            folder = os.path.basename(unquote(current_path()).rstrip("/")) or "files"
+            st.session_state["bulk_zip"] = {
+                "name": f"{folder}.zip",
+                "file": spool,
+                "count": count,
+                "size": spool.tell(),
+                "ready": False,
+            }
+            if not errors:
+                rerun_run()
+with b5:
+    if st.button("🗑️ 선택 삭제", disabled=not selected, use_container_width=True):
+        st.session_state["bulk_delete_confirm"] = True
+        rerun_run()
 
 # ── 헤더 ─────────────────────────────────────────────────────
-h = st.columns([0.5, 4, 1.5, 2, 3])
+h = st.columns([0.4, 0.5, 4, 1.5, 2, 3])
 h[0].markdown("**　**")
-h[1].markdown("**이름**")
-h[2].markdown("**크기**")
-h[3].markdown("**수정 날짜**")
-h[4].markdown("**동작**")
+h[1].markdown("**　**")
+h[2].markdown("**이름**")
+h[3].markdown("**크기**")
+h[4].markdown("**수정 날짜**")
+h[5].markdown("**동작**")
 st.divider()
 
 # ── 파일 목록 ────────────────────────────────────────────────
-for item in all_items:
+for item in page_items:
     raw_name = item["name"]                          # 원본 (인코딩될 수 있음)
     name     = unquote(raw_name)                     # 화면 표시용 디코딩 이름
     is_dir   = item["type"] == "directory"
     ext      = os.path.splitext(name)[1].lower()
-    href     = item.get("href", "")
-    item_path = href if href.startswith("/") else os.path.join(current_path(), raw_name)
-    if is_dir and not item_path.endswith("/"):
-        item_path += "/"
+    item_path = item_path_of(item, current_path())
 
     # 파일명만 표시 (경로 제거)
     display_name = os.path.basename(name.rstrip("/"))
 
-    col_icon, col_name, col_size, col_date, col_action = st.columns([0.5, 4, 1.5, 2, 3])
-    col_icon.write(get_icon(item))
+    col_sel, col_icon, col_name, col_size, col_date, col_action = st.columns([0.4, 0.5, 4, 1.5, 2, 3])
+    sel_key = f"sel_{item_path}"
+    st.session_state[sel_key] = item_path in selected
+    col_sel.checkbox(
+        "선택",
+        key=sel_key,
+        on_change=toggle_selected,
+        args=(item_path, {"name": display_name, "is_dir": is_dir, "tag": item_tag(item)}),
+        label_visibility="collapsed",
+    )
+    thumb = None
+    if st.session_state["show_thumbs"] and not is_dir and ext in THUMB_EXTS:
+        thumb = thumb_store.get(item_path, item_tag(item), ext)
+    if thumb:
+        col_icon.image(thumb, width=48)
+    else:
+        col_icon.write(get_icon(item))
     col_name.write(display_name)
-    col_size.write("—" if is_dir else fmt_size(item.get("content_length")))
+    col_size.write(fmt_size(folder_sizes.get(dir_key(item_path))) if is_dir else fmt_size(item.get("content_length")))
     col_date.write(fmt_date(item))
 
     with col_action:
@@ -261,14 +1851,15 @@ for item in all_items:
             with a1:
                 if st.button("열기 →", key=f"open_{item_path}", use_container_width=True):
                     navigate_to(item_path)
-                    st.rerun()
+                    rerun_run()
             with a2:
                 if st.button("🗑️", key=f"del_{item_path}", help="삭제", use_container_width=True):
                     st.session_state["delete_confirm"] = item_path
-                    st.rerun()
+                    rerun_run()
 
         else:
-            can_preview = ext in IMAGE_EXTS | PDF_EXTS
+            is_media    = MEDIA_ENABLED and ext in VIDEO_EXTS | AUDIO_EXTS
+            can_preview = ext in IMAGE_EXTS | PDF_EXTS or is_media
 
             if can_preview:
                 a1, a2, a3 = st.columns([2, 2, 1])
@@ -279,39 +1870,89 @@ for item in all_items:
             # 미리보기
             if can_preview:
                 with a1:
-                    if st.button("🔎 미리보기", key=f"pv_{item_path}", use_container_width=True):
+                    label = "▶️ 재생" if is_media else "🔎 미리보기"
+                    if st.button(label, key=f"pv_{item_path}", use_container_width=True):
                         try:
-                            data = download_file(item_path)
+                            if not is_media:   # 재생은 필요한 구간만 그때그때 받음
+                                get_file(item_path, item_tag(item))
                             st.session_state["preview"] = {
                                 "name": display_name,
-                                "data": data,
+                                "path": item_path,
+                                "tag": item_tag(item),
                                 "ext": ext,
+                                "page": 1,
+                                "size": item.get("content_length"),
                             }
-                            st.rerun()
+                            rerun_run()
                         except Exception as e:
                             st.error(f"미리보기 실패: {e}")
 
-            # 다운로드
+            # 다운로드 (클릭한 파일만 그때 받아옴)
             dl_col = a2 if can_preview else a1
             with dl_col:
-                try:
-                    data = download_file(item_path)
-                    st.download_button(
-                        "⬇️ 다운로드",
-                        data=data,
-                        file_name=display_name,
-                        key=f"dl_{item_path}",
-                        use_container_width=True,
-                    )
-                except Exception:
-                    st.caption("다운로드 불가")
+                if st.button("⬇️ 다운로드", key=f"dl_{item_path}", use_container_width=True):
+                    if is_media:   # 통째로 받지 않고 스트리밍 링크로 내려받음
+                        st.session_state["preview"] = {
+                            "name": display_name,
+                            "path": item_path,
+                            "tag": item_tag(item),
+                            "ext": ext,
+                            "size": item.get("content_length"),
+                        }
+                        rerun_run()
+                    try:
+                        with st.spinner("파일 받는 중..."):
+                            size = len(get_file(item_path, item_tag(item)))
+                        st.session_state["download"] = {
+                            "name": display_name,
+                            "path": item_path,
+                            "tag": item_tag(item),
+                            "size": size,
+                            "ready": False,
+                        }
+                        rerun_run()
+                    except Exception as e:
+                        st.error(f"다운로드 실패: {e}")
 
             # 삭제
             del_col = a3 if can_preview else a2
             with del_col:
                 if st.button("🗑️", key=f"del_{item_path}", help="삭제", use_container_width=True):
                     st.session_state["delete_confirm"] = item_path
-                    st.rerun()
+                    rerun_run()
+
+# 다음에 열 만한 하위 폴더 목록을 미리 읽어 캐시에 올려 둠
+listing_cache.prefetch(
+    [item_path_of(i, current_path()) for i in page_items if i["type"] == "directory"]
+)
+
+if st.session_state["show_thumbs"] and thumb_store.pending_count():
+    t1, t2 = st.columns([4, 1])
+    t1.caption(f"🖼️ 썸네일 {thumb_store.pending_count()}개 생성 중...")
+    if t2.button("썸네일 표시", use_container_width=True):
+        rerun_run()
+
+# ── 일괄 삭제 확인 ───────────────────────────────────────────
+if st.session_state["bulk_delete_confirm"] and selected:
+    st.divider()
+    st.warning(f"⚠️ 선택한 **{len(selected)}개** 항목을 정말 삭제하시겠습니까? 되돌릴 수 없습니다.")
+    c1, c2, _ = st.columns([1, 1, 4])
+
+    with c1:
+        if st.button("✅ 삭제 확인", key="bulk_del_ok", type="primary", use_container_width=True):
+            with st.spinner("삭제 중..."):
+                errors = remove_many(list(selected))
+            for path, err in errors.items():
+                st.error(f"삭제 실패: {os.path.basename(unquote(path).rstrip('/'))} - {err}")
+            st.session_state["selected"] = {p: e for p, e in selected.items() if p in errors}
+            st.session_state["bulk_delete_confirm"] = False
+            st.session_state["refresh_counter"] += 1
+            if not errors:
+                rerun_run()
+    with c2:
+        if st.button("❌ 취소", key="bulk_del_cancel", use_container_width=True):
+            st.session_state["bulk_delete_confirm"] = False
+            rerun_run()
 
 # ── 삭제 확인 ────────────────────────────────────────────────
 if st.session_state["delete_confirm"]:
@@ -325,14 +1966,19 @@ if st.session_state["delete_confirm"]:
     with c1:
         if st.button("✅ 삭제 확인", type="primary", use_container_width=True):
             try:
-                client.remove(safe_path(target))
+                remove_path(target)
+                listing_cache.invalidate_item(target)
+                content_cache.invalidate(target)
+                st.session_state["selected"].pop(target, None)
                 st.success(f"🗑️ '{target_name}' 삭제 완료")
                 st.session_state["delete_confirm"] = None
-                do_refresh()
-                st.rerun()
+                st.session_state["refresh_counter"] += 1
+                rerun_run()
             except Exception as e:
                 st.error(f"삭제 실패: {e}")
     with c2:
         if st.button("❌ 취소", use_container_width=True):
             st.session_state["delete_confirm"] = None
-            st.rerun()
+            rerun_run()
+
+record_rerun()
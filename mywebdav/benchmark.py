@@ -0,0 +1,307 @@
+"""mywebdav 벤치마크 - 로컬 WebDAV 서버(wsgidav)에 합성 폴더를 만들고 app.py를
+Streamlit AppTest로 헤드리스 실행해 목록/정렬/미리보기/다운로드 지연을 잰다.
+
+    pip install wsgidav cheroot
+    python mywebdav/benchmark.py --entries 10,100,1000,10000 --file-sizes 4k,256k,4m
+    python mywebdav/benchmark.py --entries 1000 --sessions 8 --json results.jsonl
+
+폴더 크기마다 별도 프로세스에서 앱을 돌리고, 로컬 서버는 그 아래 또 다른
+프로세스에서 띄우므로 peak RSS는 앱만의 값이다. 전송량은 WebDAV 서버 쪽에서
+응답 바이트를 센 값이다. 썸네일 생성과 하위 폴더 미리 읽기는 측정 구간 밖에서
+트래픽을 만들므로 끄고 잰다.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue as queue_mod
+import resource
+import socket
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+USER, PASSWORD = "bench", "bench"
+
+def parse_size(text):
+    text = text.strip().lower()
+    for suffix, mult in (("k", 1024), ("m", 1024 ** 2), ("g", 1024 ** 3)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * mult)
+    return int(text)
+
+def size_label(n):
+    for suffix, mult in (("g", 1024 ** 3), ("m", 1024 ** 2), ("k", 1024)):
+        if n >= mult and n % mult == 0:
+            return f"{n // mult}{suffix}"
+    return str(n)
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def peak_rss_mb():
+    # Linux는 KB, macOS는 바이트 단위
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+# ── 합성 폴더 ─────────────────────────────────────────────────
+def make_tree(root, entries, sizes):
+    """entries개 항목: 약 10%는 하위 폴더(작은 파일 3개), 나머지는 파일
+
+    일반 파일은 sparse 파일이라 디스크를 거의 쓰지 않는다. 미리보기용으로
+    실제 JPEG와 PDF를 하나씩 넣는다.
+    """
+    from PIL import Image
+
+    os.makedirs(root)
+    img = Image.new("RGB", (1600, 1200), (90, 140, 200))
+    img.save(os.path.join(root, "preview.jpg"), quality=90)
+    img.save(os.path.join(root, "preview.pdf"))
+    for i in range(max(entries - 2, 0)):
+        if i % 10 == 9:
+            sub = os.path.join(root, f"dir_{i:05d}")
+            os.makedirs(sub)
+            for j in range(3):
+                with open(os.path.join(sub, f"small_{j}.txt"), "wb") as f:
+                    f.write(b"x" * 1024)
+        else:
+            with open(os.path.join(root, f"file_{i:05d}.bin"), "wb") as f:
+                f.truncate(sizes[i % len(sizes)])
+
+def files_by_size(entries, sizes):
+    """크기별로 make_tree가 만든 첫 파일 이름 → {크기: 이름}"""
+    found = {}
+    for i in range(max(entries - 2, 0)):
+        if i % 10 != 9:
+            found.setdefault(sizes[i % len(sizes)], f"file_{i:05d}.bin")
+    return found
+
+# ── 로컬 WebDAV 서버 ──────────────────────────────────────────
+class ByteCounter:
+    """WSGI 미들웨어: 응답 본문 바이트와 요청 수 집계
+
+    counts는 프로세스 공유 배열 [바이트, 요청 수] - 서버 프로세스가 쓰고
+    벤치마크 프로세스가 snapshot()으로 읽는다.
+    """
+
+    def __init__(self, counts, app=None):
+        self.app = app
+        self.counts = counts
+
+    def __call__(self, environ, start_response):
+        with self.counts.get_lock():
+            self.counts[1] += 1
+        for chunk in self.app(environ, start_response):
+            with self.counts.get_lock():
+                self.counts[0] += len(chunk)
+            yield chunk
+
+    def snapshot(self):
+        with self.counts.get_lock():
+            return self.counts[0], self.counts[1]
+
+def _serve(root, port, counts):
+    """서버 프로세스 본체"""
+    from cheroot import wsgi
+    from wsgidav.wsgidav_app import WsgiDAVApp
+
+    app = WsgiDAVApp({
+        "host": "127.0.0.1",
+        "port": port,
+        "provider_mapping": {"/": root},
+        "simple_dc": {"user_mapping": {"*": {USER: {"password": PASSWORD}}}},
+        "http_authenticator": {"accept_basic": True, "accept_digest": False, "default_to_digest": False},
+        "verbose": 0,
+        "logging": {"enable": False},
+    })
+    wsgi.Server(("127.0.0.1", port), ByteCounter(counts, app), numthreads=16).start()
+
+def start_server(root, port):
+    """로컬 WebDAV 서버를 별도 프로세스로 띄움 → (프로세스, 카운터)"""
+    ctx = multiprocessing.get_context("spawn")
+    counts = ctx.Array("q", 2)
+    proc = ctx.Process(target=_serve, args=(root, port, counts), daemon=True)
+    proc.start()
+    for _ in range(400):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            if not proc.is_alive():
+                raise RuntimeError(f"WebDAV 서버 시작 실패 (exit code {proc.exitcode})")
+            time.sleep(0.05)
+    return proc, ByteCounter(counts)
+
+# ── 시나리오 ──────────────────────────────────────────────────
+def new_session(port, work_dir, tree):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.secrets.update({
+        "PASSWORD_1": PASSWORD,
+        "WEBDAV_URL": f"http://127.0.0.1:{port}",
+        "WEBDAV_USER": USER,
+        "WEBDAV_PASSWORD": PASSWORD,
+        "WEBDAV_ROOT": f"/{tree}/",
+        "CONTENT_CACHE_DIR": os.path.join(work_dir, "cache"),
+        "THUMB_DIR": os.path.join(work_dir, "thumbs"),
+        "INDEX_DB": os.path.join(work_dir, "index.sqlite3"),
+        "INDEX_INTERVAL": 0,
+        "PREFETCH_WORKERS": 0,
+    })
+    at.session_state["authenticated"] = True
+    at.session_state["show_thumbs"] = False
+    return at
+
+def run_together(apps):
+    """AppTest 세션 여러 개를 스레드에서 동시에 실행 → 세션별 지연(ms) 목록"""
+    def run_one(at):
+        start = time.perf_counter()
+        at.run()
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=len(apps)) as pool:
+        return list(pool.map(run_one, apps))
+
+def find_button(at, prefix, suffix=""):
+    for b in at.button:
+        if b.key and b.key.startswith(prefix) and b.key.endswith(suffix):
+            return b
+    raise LookupError(f"버튼 없음: {prefix}*{suffix}")
+
+def run_scenarios(entries, sizes, repeat, sessions):
+    """한 폴더 크기에 대해 모든 시나리오 실행 (자식 프로세스에서 호출)"""
+    work_dir = tempfile.mkdtemp(prefix="mywebdav-bench-")
+    tree = f"tree_{entries}"
+    make_tree(os.path.join(work_dir, "dav", tree), entries, sizes)
+    port = free_port()
+    server, counter = start_server(os.path.join(work_dir, "dav"), port)
+    results = []
+
+    def measure(name, step, apps=None):
+        """step 실행 시간과 그동안의 서버 트래픽 기록
+
+        apps를 주면 step은 그 세션들을 동시에 돌리고 세션별 지연 목록을 반환한다.
+        """
+        bytes0, req0 = counter.snapshot()
+        start = time.perf_counter()
+        out = step()
+        elapsed = (time.perf_counter() - start) * 1000
+        for at in apps or [out]:
+            if at.exception:
+                raise RuntimeError(f"{name}: {at.exception[0].message}")
+        bytes1, req1 = counter.snapshot()
+        row = {
+            "entries": entries, "scenario": name, "ms": round(elapsed, 1),
+            "bytes": bytes1 - bytes0, "requests": req1 - req0,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+        if apps:
+            row["sessions"] = len(apps)
+            row["session_ms_max"] = round(max(out), 1)
+        results.append(row)
+        return out
+
+    try:
+        at = new_session(port, work_dir, tree)
+        measure("list (cold)", at.run)
+        for i in range(repeat):
+            measure("rerun (warm)", at.run)
+        for key in ("크기", "수정 날짜", "이름"):
+            sort_box = next(sb for sb in at.selectbox if sb.label == "정렬")
+            measure(f"sort: {key}", sort_box.set_value(key).run)
+        # 큰 폴더는 첫 페이지가 하위 폴더로 차므로 이름 필터로 대상 행을 띄움
+        name_box = next(ti for ti in at.text_input if ti.label == "이름 필터")
+        measure("filter: preview", name_box.set_value("preview").run)
+        measure("preview: jpg", find_button(at, "pv_", "preview.jpg").click().run)
+        measure("preview: pdf", find_button(at, "pv_", "preview.pdf").click().run)
+        # 크기마다 그 크기의 파일 하나를 이름으로 찾아 받음
+        for size, name in files_by_size(entries, sizes).items():
+            label = size_label(size)
+            name_box = next(ti for ti in at.text_input if ti.label == "이름 필터")
+            measure(f"filter: {label}", name_box.set_value(name).run)
+            measure(f"download {label} (cold)", find_button(at, "dl_", name).click().run)
+            measure(f"download {label} (cached)", find_button(at, "dl_", name).click().run)
+        other = new_session(port, work_dir, tree)
+        measure("list (2nd session)", other.run)
+        if sessions > 1:
+            apps = [new_session(port, work_dir, tree) for _ in range(sessions)]
+            measure(f"list x{sessions} (concurrent)", lambda: run_together(apps), apps)
+            measure(f"rerun x{sessions} (concurrent)", lambda: run_together(apps), apps)
+    finally:
+        server.terminate()
+        server.join()
+    return results
+
+def _worker(entries, sizes, repeat, sessions, queue):
+    try:
+        queue.put(("ok", run_scenarios(entries, sizes, repeat, sessions)))
+    except Exception as e:
+        queue.put(("error", f"{type(e).__name__}: {e}"))
+
+def wait_result(proc, queue, timeout):
+    """자식 프로세스 결과 대기 - 결과 없이 죽거나(OOM 등) 시간을 넘기면 오류로"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except queue_mod.Empty:
+            pass
+        if not proc.is_alive():
+            try:
+                return queue.get(timeout=1)
+            except queue_mod.Empty:
+                return "error", f"자식 프로세스가 결과 없이 종료됨 (exit code {proc.exitcode})"
+        if time.monotonic() > deadline:
+            proc.terminate()
+            return "error", f"{timeout}초 안에 끝나지 않음"
+
+def print_table(rows):
+    header = f"{'entries':>8}  {'scenario':<24} {'ms':>9} {'bytes':>12} {'reqs':>6} {'peak RSS MB':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['entries']:>8}  {r['scenario']:<24} {r['ms']:>9.1f} {r['bytes']:>12,} "
+              f"{r['requests']:>6} {r['peak_rss_mb']:>12.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", default="10,100,1000,10000",
+                        help="폴더당 항목 수 목록 (쉼표 구분)")
+    parser.add_argument("--file-sizes", default="4k,256k,4m",
+                        help="파일 크기 목록, 항목마다 순환 (예: 4k,256k,4m)")
+    parser.add_argument("--repeat", type=int, default=3, help="warm rerun 반복 횟수")
+    parser.add_argument("--sessions", type=int, default=4,
+                        help="동시에 돌릴 세션 수 (1이면 동시 실행 시나리오 생략)")
+    parser.add_argument("--timeout", type=float, default=1800, help="폴더 크기 하나당 제한 시간(초)")
+    parser.add_argument("--json", metavar="PATH", help="결과를 JSON Lines로 저장")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.file_sizes.split(",")]
+    ctx = multiprocessing.get_context("spawn")
+    rows, failed = [], False
+    for entries in (int(n) for n in args.entries.split(",")):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_worker, args=(entries, sizes, args.repeat, args.sessions, queue))
+        proc.start()
+        status, payload = wait_result(proc, queue, args.timeout)
+        proc.join()
+        if status == "ok":
+            rows.extend(payload)
+        else:
+            failed = True
+            print(f"[entries={entries}] 실패: {payload}", file=sys.stderr)
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            for r in rows:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
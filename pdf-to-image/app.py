@@ -1,7 +1,17 @@
 import streamlit as st
-from pdf2image import convert_from_bytes
 from pypdf import PdfReader
+from converter import (
+    DEFAULT_PASSTHROUGH, DEFAULT_PRESET, ENCODE_PRESETS, PASSTHROUGH_MODES, PageCache,
+    convert_documents, link_or_copy, make_thumbnail, parse_page_set, pdf_digest, plan_documents,
+)
 import zipfile
+import tempfile
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import io
 import os
 
@@ -38,14 +48,96 @@ def check_password():
 
 check_password()
 
-# ── 이미지 → bytes 변환 헬퍼 ─────────────────────────────────
-def img_to_bytes(img, fmt, quality):
-    buf = io.BytesIO()
-    if fmt == "JPG":
-        img.convert("RGB").save(buf, format="JPEG", quality=quality, optimize=True)
+# ── 변환 캐시 (세션 공유, 디스크) ─────────────────────────────
+PDF_CACHE_DIR = st.secrets.get(
+    "PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pdf2img-cache")
+)
+PDF_CACHE_MB = float(st.secrets.get("PDF_CACHE_MB", 2048))
+
+@st.cache_resource
+def get_page_cache():
+    return PageCache(PDF_CACHE_DIR, int(PDF_CACHE_MB * 1024 * 1024))
+
+page_cache = get_page_cache()
+
+# ── 렌더링 프로세스 풀 (세션 공유) ────────────────────────────
+# 모든 세션·문서의 페이지가 이 풀 하나로 들어간다. 세션마다 대기열에 올리는
+# 작업 수가 제한되어 있어 한 사용자의 큰 작업이 다른 사용자를 막지 않는다.
+RENDER_WORKERS = int(st.secrets.get("RENDER_WORKERS", os.cpu_count() or 1))
+
+@st.cache_resource
+def get_render_pool():
+    # 멀티스레드 서버 프로세스를 fork하지 않도록 forkserver(없으면 spawn)로 워커 생성
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context(method))
+
+def replace_render_pool(broken):
+    """워커가 죽어(OOM 등) 깨진 풀을 버리고 새 풀 반환 - 다른 세션이 이미 바꿨으면 그 풀을 씀"""
+    if get_render_pool() is broken:
+        get_render_pool.clear()
+    broken.shutdown(wait=False, cancel_futures=True)
+    return get_render_pool()
+
+render_pool = get_render_pool()
+
+# ── 변환 결과 정리 (페이지 이미지는 임시 폴더에 보관) ─────────
+ZIP_SPOOL_MB = float(st.secrets.get("ZIP_SPOOL_MB", 32))
+SESSION_TTL  = float(st.secrets.get("SESSION_TTL", 3600))
+PREVIEW_WIDTH     = 360   # 미리보기 썸네일 가로 px
+PREVIEW_PAGE_SIZE = 12    # 미리보기 한 화면에 보일 페이지 수
+
+class OutputDirs:
+    """세션별 결과 폴더 목록 - SESSION_TTL 동안 쓰이지 않으면 (세션 만료) 삭제"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._seen = {}   # 폴더 -> 마지막 사용 시각
+        self._lock = threading.Lock()
+
+    def touch(self, out_dir):
+        with self._lock:
+            self._seen[out_dir] = time.time()
+
+    def release(self, out_dir):
+        with self._lock:
+            self._seen.pop(out_dir, None)
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            expired = [d for d, t in self._seen.items() if now - t > self.ttl]
+        for out_dir in expired:
+            self.release(out_dir)
+
+@st.cache_resource
+def get_output_dirs():
+    return OutputDirs(SESSION_TTL)
+
+output_dirs = get_output_dirs()
+output_dirs.sweep()
+
+def reset_conversion():
+    out_dir = st.session_state.get("conv_dir")
+    if out_dir:
+        output_dirs.release(out_dir)
+    for archive in st.session_state.get("converted_zips") or []:
+        archive["file"].close()
+    st.session_state["converted_docs"] = None
+    st.session_state["converted_zips"] = None
+    st.session_state["conv_meta"] = None
+    st.session_state["conv_dir"] = None
+    st.session_state["zip_ready"] = None
+    st.session_state["page_dl"] = None
+    st.session_state["preview_page"] = 0
+    st.session_state["preview_doc"] = 0
+
+# 살아 있는 세션은 사용 시각 갱신, 만료로 지워졌으면 결과도 비움
+if st.session_state.get("conv_dir"):
+    if os.path.isdir(st.session_state["conv_dir"]):
+        output_dirs.touch(st.session_state["conv_dir"])
     else:
-        img.save(buf, format="PNG", optimize=True)
-    return buf.getvalue()
+        reset_conversion()
 
 # ── 사이드바 ─────────────────────────────────────────────────
 with st.sidebar:
@@ -75,6 +167,22 @@ with st.sidebar:
             help="높을수록 고화질 (파일 크기 증가)",
         )
 
+    encode_preset = st.radio(
+        "⚡ 인코딩",
+        list(ENCODE_PRESETS),
+        index=list(ENCODE_PRESETS).index(DEFAULT_PRESET),
+        horizontal=True,
+        help="빠르게: 압축을 줄여 저장 속도 우선 / 최소 크기: 느리지만 파일이 가장 작음",
+    )
+
+    passthrough = PASSTHROUGH_MODES[st.selectbox(
+        "📷 스캔 페이지",
+        list(PASSTHROUGH_MODES),
+        index=list(PASSTHROUGH_MODES).index(DEFAULT_PASSTHROUGH),
+        help="JPEG 한 장으로 된 스캔 페이지는 다시 렌더링하지 않고 원본 이미지를 꺼냅니다. "
+             "원본 해상도: 그대로 저장 / DPI에 맞춤: 선택한 해상도 크기로 조정",
+    )]
+
     st.divider()
 
     page_mode = st.radio(
@@ -92,6 +200,7 @@ with st.sidebar:
 
     st.divider()
     if st.button("🚪 로그아웃", use_container_width=True):
+        reset_conversion()
         st.session_state.clear()
         st.rerun()
 
@@ -100,26 +209,21 @@ st.title("🖼️ PDF → Image 변환기")
 st.caption("PDF 파일을 JPG 또는 PNG 이미지로 변환합니다.")
 
 # ── 파일 업로드 ──────────────────────────────────────────────
-uploaded_file = st.file_uploader(
-    "PDF 파일을 업로드하세요",
+uploaded_files = st.file_uploader(
+    "PDF 파일을 업로드하세요 (여러 개 가능)",
     type=["pdf"],
-    help="최대 200MB까지 지원합니다.",
+    accept_multiple_files=True,
+    help="파일당 최대 200MB까지 지원합니다. 여러 파일은 한 번에 이어서 변환합니다.",
 )
 
-# 파일이 바뀌면 이전 변환 결과 초기화
-current_file = uploaded_file.name if uploaded_file else None
-if current_file != st.session_state.get("last_file"):
-    st.session_state["converted_images"] = None
-    st.session_state["converted_zip"] = None
-    st.session_state["last_file"] = current_file
-    st.session_state["conv_meta"] = None
-
-if uploaded_file is None:
+if not uploaded_files:
+    reset_conversion()
+    st.session_state["last_file"] = None
     st.markdown(
         """
         ### 사용 방법
         1. 왼쪽 사이드바에서 **출력 형식**, **해상도**, **페이지 범위**를 설정하세요.
-        2. 위 영역에 PDF 파일을 드래그하거나 클릭해서 업로드하세요.
+        2. 위 영역에 PDF 파일을 드래그하거나 클릭해서 업로드하세요. 여러 파일을 한꺼번에 올릴 수 있습니다.
         3. **변환 시작** 버튼을 누르면 전체 ZIP 다운로드 또는 페이지별 개별 다운로드가 가능합니다.
 
         | 형식 | 특징 |
@@ -131,32 +235,76 @@ if uploaded_file is None:
     st.stop()
 
 # ── PDF 읽기 ─────────────────────────────────────────────────
-pdf_bytes = uploaded_file.read()
-
-try:
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    total_pages = len(reader.pages)
-except Exception:
-    st.error("PDF 파일을 읽을 수 없습니다. 손상되었거나 암호화된 파일일 수 있습니다.")
+# 해시(SHA-256)는 업로드마다 한 번만 계산
+digests = st.session_state.setdefault("digests", {})
+docs = []
+basenames = set()
+for uploaded_file in uploaded_files:
+    pdf_bytes = uploaded_file.getvalue()
+    upload_id = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+    if upload_id not in digests:
+        digests[upload_id] = pdf_digest(pdf_bytes)
+    try:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        total_pages = len(reader.pages)
+    except Exception:
+        st.error(f"**{uploaded_file.name}**: PDF 파일을 읽을 수 없습니다. 손상되었거나 암호화된 파일일 수 있습니다.")
+        continue
+    basename = os.path.splitext(uploaded_file.name)[0]
+    unique, n = basename, 2
+    while unique in basenames:
+        unique, n = f"{basename}_{n}", n + 1
+    basenames.add(unique)
+    docs.append({
+        "name": uploaded_file.name,
+        "basename": unique,
+        "bytes": pdf_bytes,
+        "digest": digests[upload_id],
+        "reader": reader,
+        "total": total_pages,
+        "pages": list(range(1, total_pages + 1)),
+    })
+
+if not docs:
     st.stop()
 
-st.success(f"✅ **{uploaded_file.name}** 업로드 완료 ({total_pages}페이지)")
-
-# ── 페이지 범위 선택 ─────────────────────────────────────────
-first_page, last_page = 1, total_pages
+# 문서 내용이 바뀌면 이전 변환 결과 초기화
+doc_key = tuple(d["digest"] for d in docs)
+if doc_key != st.session_state.get("last_file"):
+    reset_conversion()
+    st.session_state["last_file"] = doc_key
+
+if len(docs) == 1:
+    st.success(f"✅ **{docs[0]['name']}** 업로드 완료 ({docs[0]['total']}페이지)")
+else:
+    st.success(f"✅ PDF {len(docs)}개 업로드 완료 (총 {sum(d['total'] for d in docs)}페이지)")
+
+# ── 페이지 범위 선택 (문서가 하나일 때) ─────────────────────
+if page_mode == "특정 페이지 지정" and len(docs) == 1 and docs[0]["total"] > 1:
+    total_pages = docs[0]["total"]
+    page_spec = st.text_input(
+        "페이지 지정",
+        value=f"1-{total_pages}",
+        placeholder="예: 1,3,5-9,190",
+        help="쉼표로 구분, 범위는 '-'로 지정합니다. 선택한 페이지만 추려서 변환합니다.",
+    )
+    try:
+        docs[0]["pages"] = parse_page_set(page_spec, total_pages)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+elif page_mode == "특정 페이지 지정" and len(docs) > 1:
+    st.caption("ℹ️ 여러 문서를 변환할 때는 전체 페이지를 변환합니다.")
 
-if page_mode == "특정 페이지 지정" and total_pages > 1:
-    col1, col2 = st.columns(2)
-    with col1:
-        first_page = st.number_input("시작 페이지", min_value=1, max_value=total_pages, value=1)
-    with col2:
-        last_page = st.number_input("끝 페이지", min_value=first_page, max_value=total_pages, value=total_pages)
+num_pages = sum(len(d["pages"]) for d in docs)
 
-num_pages = last_page - first_page + 1
+bundle = "하나로 합치기"
+if len(docs) > 1:
+    bundle = st.radio("📦 ZIP 묶기", ["하나로 합치기", "문서별 ZIP"], horizontal=True)
 
 # ── 변환 요약 ────────────────────────────────────────────────
 c1, c2, c3, c4 = st.columns(4)
-c1.metric("변환 페이지", f"{num_pages}장")
+c1.metric("변환 페이지", f"{num_pages}장" if len(docs) == 1 else f"{len(docs)}개 문서 · {num_pages}장")
 c2.metric("출력 형식", output_format)
 c3.metric("해상도", f"{dpi} DPI")
 c4.metric("품질", f"{jpg_quality}%" if output_format == "JPG" else "무손실")
@@ -167,82 +315,204 @@ st.divider()
 if st.button("🚀 변환 시작", type="primary", use_container_width=True):
     progress = st.progress(0, text="변환 준비 중...")
     status = st.empty()
+    doc_bars = [st.progress(0, text=d["name"]) for d in docs] if len(docs) > 1 else []
 
     try:
-        status.info(f"🔄 {num_pages}페이지 변환 중... (DPI: {dpi})")
-
-        images = convert_from_bytes(
-            pdf_bytes,
-            dpi=dpi,
-            first_page=first_page,
-            last_page=last_page,
-            fmt="jpeg" if output_format == "JPG" else "png",
-        )
+        reset_conversion()
+        ext = "jpg" if output_format == "JPG" else "png"
 
-        progress.progress(60, text="이미지 생성 완료, ZIP 압축 중...")
+        n_cached, n_embedded, n_render = plan_documents(
+            docs, dpi, output_format, jpg_quality, encode_preset, passthrough, cache=page_cache
+        )
+        status.info(
+            f"🔄 {num_pages}페이지 변환 중... (DPI: {dpi}, 캐시 {n_cached}장, 스캔 추출 {n_embedded}장, "
+            f"새로 렌더링 {n_render}장 / 공유 프로세스 {RENDER_WORKERS}개)"
+        )
 
-        basename = os.path.splitext(uploaded_file.name)[0]
-        ext = "jpg" if output_format == "JPG" else "png"
+        out_dir = tempfile.mkdtemp(prefix="pdf2img-")
+        st.session_state["conv_dir"] = out_dir
+        output_dirs.touch(out_dir)
+
+        # ZIP 하나는 ZIP_SPOOL_MB까지만 메모리, 넘으면 결과 폴더의 임시 파일로.
+        # 문서별 ZIP은 개수만큼 메모리가 늘지 않도록 처음부터 결과 폴더의 파일로.
+        # JPG/PNG는 이미 압축된 형식이라 다시 deflate하지 않고 그대로 저장
+        def new_archive(label, file_name, spooled=True):
+            if spooled:
+                f = tempfile.SpooledTemporaryFile(max_size=int(ZIP_SPOOL_MB * 1024 * 1024), dir=out_dir)
+            else:
+                f = tempfile.TemporaryFile(dir=out_dir)
+            return {"label": label, "file_name": file_name, "file": f,
+                    "zip": zipfile.ZipFile(f, "w", zipfile.ZIP_STORED), "count": 0}
+
+        if bundle == "문서별 ZIP":
+            archives = [new_archive(d["name"], f"{d['basename']}_images.zip", spooled=False) for d in docs]
+        elif len(docs) == 1:
+            archives = [new_archive("전체", f"{docs[0]['basename']}_images.zip")]
+        else:
+            archives = [new_archive("전체", "pdf_images.zip")]
+
+        results = [{"name": d["name"], "basename": d["basename"], "pages": []} for d in docs]
+        done_pages = 0
+
+        def add_page(i, page_num, cache_path):
+            global done_pages
+            # 긴 변환 도중 다른 세션의 sweep이 폴더를 지우지 않도록 페이지마다 갱신
+            output_dirs.touch(out_dir)
+            doc = docs[i]
+            name = f"{doc['basename']}_p{page_num:04d}.{ext}"
+            doc_dir = os.path.join(out_dir, f"doc{i:03d}")
+            os.makedirs(doc_dir, exist_ok=True)
+            page_path = os.path.join(doc_dir, name)
+            link_or_copy(cache_path, page_path)
+            archive = archives[i] if len(archives) > 1 else archives[0]
+            arcname = f"{doc['basename']}/{name}" if len(docs) > 1 and len(archives) == 1 else name
+            archive["zip"].write(page_path, arcname)
+            archive["count"] += 1
+            results[i]["pages"].append((page_num, page_path))
+            done_pages += 1
+            progress.progress(
+                int(95 * done_pages / num_pages),
+                text=f"변환 중... ({done_pages}/{num_pages}, {doc['name']} p{page_num} 완료)",
+            )
+            if doc_bars:
+                n = len(results[i]["pages"])
+                doc_bars[i].progress(n / len(doc["pages"]), text=f"{doc['name']} ({n}/{len(doc['pages'])})")
+
+        # 캐시 적중 → 스캔 추출 → 래스터화(공유 프로세스 풀)·인코딩 순으로 받아 결과에 추가.
+        # 풀이 깨지면(어느 세션이든 워커가 죽으면) 새 풀로 한 번 더 - 끝난 페이지는 캐시에 있음
+        added = set()
+        for attempt in range(2):
+            try:
+                for i, page_num, cache_path in convert_documents(
+                    docs, out_dir, dpi, output_format, jpg_quality, encode_preset, passthrough,
+                    cache=page_cache, pool=render_pool, workers=RENDER_WORKERS,
+                ):
+                    if (i, page_num) not in added:
+                        added.add((i, page_num))
+                        add_page(i, page_num, cache_path)
+                break
+            except BrokenProcessPool:
+                render_pool = replace_render_pool(render_pool)
+                if attempt:
+                    raise
+                status.warning("⚠️ 렌더링 프로세스가 종료되어 새로 시작합니다. 남은 페이지를 다시 변환합니다...")
+                plan_documents(docs, dpi, output_format, jpg_quality, encode_preset, passthrough, cache=page_cache)
+
+        for archive in archives:
+            archive.pop("zip").close()
+            archive["file"].seek(0)
+        for r in results:
+            r["pages"].sort()
 
-        # 개별 bytes 미리 변환해서 session_state에 저장
-        image_bytes_list = []
-        zip_buf = io.BytesIO()
-        with zipfile.ZipFile(zip_buf, "w", zipfile.ZIP_DEFLATED) as zf:
-            for i, img in enumerate(images):
-                page_num = first_page + i
-                b = img_to_bytes(img, output_format, jpg_quality)
-                image_bytes_list.append((page_num, img, b))
-                zf.writestr(f"{basename}_p{page_num:04d}.{ext}", b)
-                progress.progress(60 + int(35 * (i + 1) / len(images)), text=f"압축 중... ({i+1}/{len(images)})")
-
-        zip_buf.seek(0)
         progress.progress(100, text="완료!")
-        status.success(f"🎉 변환 완료! {len(images)}장의 이미지가 준비되었습니다.")
+        status.success(f"🎉 변환 완료! {done_pages}장의 이미지가 준비되었습니다.")
 
         # ── session_state에 저장 (다운로드 클릭해도 유지) ────
-        st.session_state["converted_images"] = image_bytes_list
-        st.session_state["converted_zip"] = zip_buf.getvalue()
+        st.session_state["converted_docs"] = results
+        st.session_state["converted_zips"] = archives
         st.session_state["conv_meta"] = {
-            "basename": basename,
             "ext": ext,
             "fmt": output_format,
-            "count": len(images),
+            "count": done_pages,
         }
 
+    except BrokenProcessPool:
+        progress.empty()
+        status.error("❌ 렌더링 프로세스가 비정상 종료되었습니다 (메모리 부족일 수 있습니다). "
+                     "DPI를 낮추거나 다시 시도하세요.")
     except Exception as e:
         progress.empty()
         status.error(f"❌ 변환 중 오류 발생: {str(e)}")
         st.exception(e)
 
 # ── 변환 결과 표시 (session_state 기반) ──────────────────────
-if st.session_state.get("converted_images"):
-    image_bytes_list = st.session_state["converted_images"]
+if st.session_state.get("converted_docs"):
+    results = st.session_state["converted_docs"]
     meta = st.session_state["conv_meta"]
 
-    # ZIP 다운로드
-    st.download_button(
-        label=f"⬇️ 전체 ZIP 다운로드 ({meta['count']}장)",
-        data=st.session_state["converted_zip"],
-        file_name=f"{meta['basename']}_images.zip",
-        mime="application/zip",
-        use_container_width=True,
-        type="primary",
-    )
+    # ZIP 다운로드 - 누를 때만 디스크에서 읽어 전송 (세션마다 RAM에 들고 있지 않음)
+    archives = st.session_state["converted_zips"]
+    for a_idx, archive in enumerate(archives):
+        label = f"{archive['count']}장" if len(archives) == 1 else f"{archive['label']} · {archive['count']}장"
+        if st.session_state.get("zip_ready") == a_idx:
+            archive["file"].seek(0)
+            st.download_button(
+                label=f"💾 ZIP 저장 ({label})",
+                data=archive["file"].read(),
+                file_name=archive["file_name"],
+                mime="application/zip",
+                use_container_width=True,
+                type="primary",
+                key=f"zip_save_{a_idx}",
+                on_click=lambda: st.session_state.update(zip_ready=None),
+            )
+        elif st.button(f"⬇️ 전체 ZIP 다운로드 ({label})", type="primary",
+                       use_container_width=True, key=f"zip_{a_idx}"):
+            st.session_state["zip_ready"] = a_idx
+            st.rerun()
 
     st.divider()
 
     # 페이지별 미리보기 + 개별 다운로드
     st.subheader("📄 페이지별 미리보기 & 개별 다운로드")
 
+    doc_idx = 0
+    if len(results) > 1:
+        doc_idx = st.selectbox(
+            "문서",
+            range(len(results)),
+            index=min(st.session_state.get("preview_doc", 0), len(results) - 1),
+            format_func=lambda i: f"{results[i]['name']} ({len(results[i]['pages'])}장)",
+        )
+        if doc_idx != st.session_state.get("preview_doc"):
+            st.session_state["preview_doc"] = doc_idx
+            st.session_state["preview_page"] = 0
+            st.session_state["page_dl"] = None
+    page_files = results[doc_idx]["pages"]
+    basename = results[doc_idx]["basename"]
+
+    # 보이는 구간만 축소 썸네일로 전송 (원본은 다운로드할 때만)
+    view_count = (len(page_files) + PREVIEW_PAGE_SIZE - 1) // PREVIEW_PAGE_SIZE
+    view = min(st.session_state.get("preview_page", 0), view_count - 1)
+    visible = page_files[view * PREVIEW_PAGE_SIZE:(view + 1) * PREVIEW_PAGE_SIZE]
+
+    if view_count > 1:
+        v1, v2, v3 = st.columns([1, 4, 1])
+        with v1:
+            if st.button("◀ 이전", disabled=view == 0, use_container_width=True):
+                st.session_state["preview_page"] = view - 1
+                st.session_state["page_dl"] = None
+                st.rerun()
+        with v2:
+            st.caption(f"페이지 {visible[0][0]}–{visible[-1][0]} ({view + 1}/{view_count})")
+        with v3:
+            if st.button("다음 ▶", disabled=view >= view_count - 1, use_container_width=True):
+                st.session_state["preview_page"] = view + 1
+                st.session_state["page_dl"] = None
+                st.rerun()
+
+    thumb_dir = os.path.join(st.session_state["conv_dir"], "thumbs")
+    os.makedirs(thumb_dir, exist_ok=True)
+
     cols = st.columns(3)
-    for i, (page_num, img, b) in enumerate(image_bytes_list):
+    for i, (page_num, page_path) in enumerate(visible):
         with cols[i % 3]:
-            st.image(img, caption=f"페이지 {page_num}", use_container_width=True)
-            st.download_button(
-                label=f"⬇️ p{page_num} 다운로드",
-                data=b,
-                file_name=f"{meta['basename']}_p{page_num:04d}.{meta['ext']}",
-                mime="image/jpeg" if meta['fmt'] == "JPG" else "image/png",
-                use_container_width=True,
-                key=f"dl_{page_num}",
-            )
+            thumb_path = os.path.join(thumb_dir, f"d{doc_idx:03d}_p{page_num:05d}.jpg")
+            if not os.path.exists(thumb_path):
+                make_thumbnail(page_path, thumb_path, PREVIEW_WIDTH)
+            st.image(thumb_path, caption=f"페이지 {page_num}", use_container_width=True)
+            if st.session_state.get("page_dl") == (doc_idx, page_num):
+                with open(page_path, "rb") as f:
+                    page_bytes = f.read()
+                st.download_button(
+                    label=f"💾 p{page_num} 저장",
+                    data=page_bytes,
+                    file_name=f"{basename}_p{page_num:04d}.{meta['ext']}",
+                    mime="image/jpeg" if meta['fmt'] == "JPG" else "image/png",
+                    use_container_width=True,
+                    key=f"save_{doc_idx}_{page_num}",
+                    on_click=lambda: st.session_state.update(page_dl=None),
+                )
+            elif st.button(f"⬇️ p{page_num} 다운로드", use_container_width=True, key=f"dl_{doc_idx}_{page_num}"):
+                st.session_state["page_dl"] = (doc_idx, page_num)
+                st.rerun()
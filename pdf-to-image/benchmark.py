@@ -0,0 +1,237 @@
+"""pdf-to-image 벤치마크 - 합성 PDF(텍스트 / 스캔 / 혼합)를 만들어 DPI·형식·품질
+조합마다 변환 엔진을 돌리고 페이지/초, peak RSS, 출력 크기를 잰다.
+
+    python pdf-to-image/benchmark.py --pages 20 --dpi 100,150,300 --formats JPG,PNG
+    python pdf-to-image/benchmark.py --fixtures scanned --scan off,fit --json results.jsonl
+
+조합마다 별도 프로세스에서 돌리므로 peak RSS는 서로 섞이지 않는다.
+"워커 RSS"는 래스터화 프로세스와 poppler 중 가장 큰 값이다. 캐시는 쓰지 않는다.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import queue as queue_mod
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from converter import PASSTHROUGH_MODES, PRESET_NAMES, SCAN_NAMES
+
+FIXTURES = ("text", "scanned", "mixed")
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+         "incididunt ut labore et dolore magna aliqua ut enim ad minim veniam quis nostrud").split()
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    # Linux는 KB, macOS는 바이트 단위
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+# ── 합성 PDF ──────────────────────────────────────────────────
+def write_text_pdf(path, pages, seed=0):
+    """글자로 꽉 찬 레터 크기 페이지 (Helvetica 본문 + 구분선), 외부 라이브러리 없이 작성"""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        lines = [b"BT /F1 9 Tf 11 TL 48 750 Td"]
+        for _ in range(64):
+            text = " ".join(rng.choice(WORDS) for _ in range(16))
+            lines.append(b"(%s) Tj T*" % text.encode())
+        lines.append(b"ET")
+        for y in range(60, 760, 140):
+            lines.append(b"0.5 w 48 %d m 564 %d l S" % (y, y))
+        stream = b"\n".join(lines)
+        kids.append(f"{len(objects) + 1} 0 R")
+        objects.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects) + 2} 0 R >>").encode())
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (n, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+def write_scanned_pdf(path, pages, dpi=200, seed=0):
+    """페이지마다 JPEG 한 장 (회색조 스캔 흉내: 종이 잡음 + 글줄 모양 블록)"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    size = (int(8.5 * dpi), int(11 * dpi))
+    noise = Image.effect_noise(size, 12).point(lambda v: 200 + v // 8)
+    images = []
+    for _ in range(pages):
+        img = noise.copy()
+        draw = ImageDraw.Draw(img)
+        y = dpi // 2
+        while y < size[1] - dpi // 2:
+            x = dpi // 2
+            while x < size[0] - dpi // 2:
+                w = rng.randint(dpi // 8, dpi // 2)
+                draw.rectangle((x, y, min(x + w, size[0] - dpi // 2), y + dpi // 12), fill=rng.randint(20, 70))
+                x += w + dpi // 14
+            y += dpi // 6
+        images.append(img)
+    images[0].save(path, "PDF", save_all=True, append_images=images[1:], resolution=dpi, quality=80)
+
+def write_mixed_pdf(path, text_path, scanned_path, pages):
+    """텍스트·스캔 페이지를 번갈아 담은 PDF"""
+    from pypdf import PdfReader, PdfWriter
+
+    text, scanned = PdfReader(text_path), PdfReader(scanned_path)
+    writer = PdfWriter()
+    for n in range(pages):
+        source = text if n % 2 == 0 else scanned
+        writer.add_page(source.pages[n // 2 % len(source.pages)])
+    with open(path, "wb") as f:
+        writer.write(f)
+
+def make_fixtures(root, pages):
+    paths = {name: os.path.join(root, f"{name}.pdf") for name in FIXTURES}
+    write_text_pdf(paths["text"], pages)
+    write_scanned_pdf(paths["scanned"], pages)
+    write_mixed_pdf(paths["mixed"], paths["text"], paths["scanned"], pages)
+    return paths
+
+# ── 실행 ─────────────────────────────────────────────────────
+def run_config(pdf_path, dpi, fmt, quality, preset, scan, workers):
+    """조합 하나 변환 (자식 프로세스에서 호출)"""
+    from converter import convert_documents, load_document, plan_documents
+
+    work_dir = tempfile.mkdtemp(prefix="pdf2img-bench-")
+    try:
+        start = time.perf_counter()
+        doc = load_document(pdf_path)
+        _, embedded, rendered = plan_documents([doc], dpi, fmt, quality, PRESET_NAMES[preset],
+                                               PASSTHROUGH_MODES[SCAN_NAMES[scan]])
+        pages = out_bytes = 0
+        for _, _, path in convert_documents(
+            [doc], work_dir, dpi, fmt, quality, PRESET_NAMES[preset],
+            PASSTHROUGH_MODES[SCAN_NAMES[scan]], workers=workers,
+        ):
+            pages += 1
+            out_bytes += os.path.getsize(path)
+            os.remove(path)
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        "pages": pages, "extracted": embedded, "rendered": rendered,
+        "s": round(elapsed, 3), "pages_per_s": round(pages / elapsed, 2),
+        "out_bytes": out_bytes, "bytes_per_page": out_bytes // max(pages, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "worker_rss_mb": round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+
+def _worker(args, queue):
+    try:
+        queue.put(("ok", run_config(*args)))
+    except Exception as e:
+        queue.put(("error", f"{type(e).__name__}: {e}"))
+
+def wait_result(proc, queue, timeout):
+    """자식 프로세스 결과 대기 - 결과 없이 죽거나(OOM 등) 시간을 넘기면 오류로"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except queue_mod.Empty:
+            pass
+        if not proc.is_alive():
+            try:
+                return queue.get(timeout=1)
+            except queue_mod.Empty:
+                return "error", f"자식 프로세스가 결과 없이 종료됨 (exit code {proc.exitcode})"
+        if time.monotonic() > deadline:
+            proc.terminate()
+            return "error", f"{timeout}초 안에 끝나지 않음"
+
+def print_table(rows):
+    header = (f"{'fixture':<8} {'dpi':>4} {'fmt':<4} {'q':>3} {'preset':<8} {'scan':<6} "
+              f"{'pages':>5} {'pages/s':>8} {'KB/page':>8} {'RSS MB':>7} {'worker MB':>9}")
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['fixture']:<8} {r['dpi']:>4} {r['format']:<4} {r['quality']:>3} {r['preset']:<8} "
+              f"{r['scan']:<6} {r['pages']:>5} {r['pages_per_s']:>8.2f} {r['bytes_per_page'] / 1024:>8.1f} "
+              f"{r['peak_rss_mb']:>7.1f} {r['worker_rss_mb']:>9.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=",".join(FIXTURES),
+                        help="합성 PDF 종류 (text, scanned, mixed 중 쉼표 구분)")
+    parser.add_argument("--pages", type=int, default=20, help="합성 PDF당 페이지 수")
+    parser.add_argument("--dpi", default="100,150,300", help="DPI 목록 (쉼표 구분)")
+    parser.add_argument("--formats", default="JPG,PNG", help="출력 형식 목록")
+    parser.add_argument("--quality", default="85", help="JPG 품질 목록 (PNG는 무시)")
+    parser.add_argument("--preset", default="balanced", help="인코딩 프리셋 목록 (fast, balanced, small)")
+    parser.add_argument("--scan", default="fit", help="스캔 페이지 처리 목록 (off, native, fit)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="래스터화 프로세스 수")
+    parser.add_argument("--timeout", type=float, default=1800, help="조합 하나당 제한 시간(초)")
+    parser.add_argument("--json", metavar="PATH", help="결과를 JSON Lines로 저장")
+    args = parser.parse_args(argv)
+
+    fixtures = args.fixtures.split(",")
+    for option, values, known in (("fixture", fixtures, FIXTURES),
+                                  ("preset", args.preset.split(","), PRESET_NAMES),
+                                  ("scan", args.scan.split(","), SCAN_NAMES),
+                                  ("format", args.formats.upper().split(","), ("JPG", "PNG"))):
+        unknown = set(values) - set(known)
+        if unknown:
+            parser.error(f"알 수 없는 {option}: {', '.join(sorted(unknown))} (가능: {', '.join(known)})")
+    fixture_dir = tempfile.mkdtemp(prefix="pdf2img-fixtures-")
+    paths = make_fixtures(fixture_dir, args.pages)
+
+    configs = []
+    for fixture, dpi, fmt, preset, scan in itertools.product(
+        fixtures, (int(d) for d in args.dpi.split(",")), args.formats.upper().split(","),
+        args.preset.split(","), args.scan.split(","),
+    ):
+        for quality in ([int(q) for q in args.quality.split(",")] if fmt == "JPG" else [0]):
+            configs.append((fixture, dpi, fmt, quality, preset, scan))
+
+    ctx = multiprocessing.get_context("spawn")
+    rows, failed = [], False
+    try:
+        for fixture, dpi, fmt, quality, preset, scan in configs:
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_worker, args=(
+                (paths[fixture], dpi, fmt, quality or 95, preset, scan, args.workers), queue))
+            proc.start()
+            status, payload = wait_result(proc, queue, args.timeout)
+            proc.join()
+            config = {"fixture": fixture, "dpi": dpi, "format": fmt, "quality": quality,
+                      "preset": preset, "scan": scan}
+            if status == "ok":
+                rows.append({**config, **payload})
+            else:
+                failed = True
+                print(f"[{config}] 실패: {payload}", file=sys.stderr)
+    finally:
+        shutil.rmtree(fixture_dir, ignore_errors=True)
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            for r in rows:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""PDF → 이미지 일괄 변환 CLI - 파일/폴더의 PDF를 모두 변환해 출력 폴더에 저장
+
+    python pdf-to-image/cli.py scans/ -o out/ --dpi 200 --format JPG --quality 85
+    python pdf-to-image/cli.py a.pdf b.pdf -o out/ --cache-dir /var/cache/pdf2img
+
+입력 폴더 구조를 따라 <출력>/<상대 경로>/<이름>_p0001.jpg 로 저장한다.
+--cache-dir를 주면 앱과 같은 페이지 캐시를 써서 다시 돌릴 때 바뀐 PDF만 변환한다.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from converter import (
+    DEFAULT_PASSTHROUGH, DEFAULT_PRESET, PASSTHROUGH_MODES, PRESET_NAMES, SCAN_NAMES, PageCache,
+    convert_documents, english_name, load_document, plan_documents,
+)
+
+def collect_pdfs(inputs):
+    """입력 파일/폴더 → (PDF 경로, 출력 상대 경로) 목록 (폴더는 하위까지)"""
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, dirnames, names in os.walk(item):
+                dirnames.sort()
+                for name in sorted(names):
+                    if name.lower().endswith(".pdf"):
+                        path = os.path.join(dirpath, name)
+                        found.append((path, os.path.relpath(path, item)))
+        else:
+            found.append((item, os.path.basename(item)))
+    return found
+
+def convert_batch(batch, args, work_dir, cache, pool):
+    """문서 묶음 하나를 변환해 출력 폴더에 저장, 문서별 (페이지 수, 바이트) 반환"""
+    ext = "jpg" if args.format == "JPG" else "png"
+    plan_documents(batch, args.dpi, args.format, args.quality, args.preset, args.scan, cache)
+    written = [[0, 0] for _ in batch]
+    for i, page_num, path in convert_documents(
+        batch, work_dir, args.dpi, args.format, args.quality, args.preset, args.scan,
+        cache=cache, pool=pool, workers=args.workers,
+    ):
+        doc = batch[i]
+        dst = os.path.join(doc["out_dir"], f"{doc['basename']}_p{page_num:04d}.{ext}")
+        if os.path.exists(dst):
+            os.remove(dst)
+        if cache is not None:
+            # 캐시 파일과 링크를 공유하면 출력을 고칠 때 캐시까지 바뀌므로 복사
+            shutil.copyfile(path, dst)
+        else:
+            os.replace(path, dst)
+        written[i][0] += 1
+        written[i][1] += os.path.getsize(dst)
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="PDF 파일 또는 폴더")
+    parser.add_argument("-o", "--output", required=True, help="출력 폴더")
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--format", choices=["JPG", "PNG"], type=str.upper, default="JPG")
+    parser.add_argument("--quality", type=int, default=85, help="JPG 품질 (50~100)")
+    parser.add_argument("--preset", choices=list(PRESET_NAMES),
+                        default=english_name(PRESET_NAMES, DEFAULT_PRESET),
+                        help="인코딩 프리셋 (fast=빠르게, balanced=균형, small=최소 크기)")
+    parser.add_argument("--scan", choices=list(SCAN_NAMES),
+                        default=english_name(SCAN_NAMES, DEFAULT_PASSTHROUGH),
+                        help="스캔 페이지 원본 추출 (off / native=원본 해상도 / fit=DPI에 맞춤)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="래스터화 프로세스 수")
+    parser.add_argument("--batch", type=int, default=8,
+                        help="한 번에 같은 작업 흐름으로 넣을 문서 수")
+    parser.add_argument("--cache-dir", help="페이지 캐시 폴더 (앱의 PDF_CACHE_DIR와 공유 가능)")
+    parser.add_argument("--cache-mb", type=float, default=2048)
+    args = parser.parse_args(argv)
+    args.preset = PRESET_NAMES[args.preset]
+    args.scan = PASSTHROUGH_MODES[SCAN_NAMES[args.scan]]
+    if args.format == "PNG":
+        args.quality = 95
+
+    sources = collect_pdfs(args.inputs)
+    if not sources:
+        print("변환할 PDF가 없습니다.", file=sys.stderr)
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+    cache = PageCache(args.cache_dir, int(args.cache_mb * 1024 * 1024)) if args.cache_dir else None
+
+    failed = 0
+    total_pages = total_bytes = 0
+    start = time.perf_counter()
+    # 결과를 os.replace로 옮기도록 작업 폴더는 출력 폴더와 같은 파일시스템에
+    work_dir = tempfile.mkdtemp(prefix=".pdf2img-", dir=args.output)
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for b in range(0, len(sources), args.batch):
+                batch = []
+                for path, rel in sources[b:b + args.batch]:
+                    try:
+                        doc = load_document(path, with_digest=cache is not None)
+                    except Exception as e:
+                        failed += 1
+                        print(f"✗ {rel}: PDF를 읽을 수 없습니다 ({e})", file=sys.stderr)
+                        continue
+                    rel_base = os.path.splitext(rel)[0]
+                    doc["basename"] = os.path.basename(rel_base)
+                    doc["out_dir"] = os.path.join(args.output, rel_base)
+                    os.makedirs(doc["out_dir"], exist_ok=True)
+                    doc["rel"] = rel
+                    batch.append(doc)
+                if not batch:
+                    continue
+                try:
+                    written = convert_batch(batch, args, work_dir, cache, pool)
+                except Exception as e:
+                    failed += len(batch)
+                    names = ", ".join(d["rel"] for d in batch)
+                    print(f"✗ {names}: 변환 실패 ({type(e).__name__}: {e})", file=sys.stderr)
+                    continue
+                for doc, (pages, size) in zip(batch, written):
+                    total_pages += pages
+                    total_bytes += size
+                    print(f"✓ {doc['rel']}: {pages}장, {size / 1024 / 1024:.1f}MB")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"완료: 문서 {len(sources) - failed}/{len(sources)}개, {total_pages}장, "
+          f"{total_bytes / 1024 / 1024:.1f}MB, {elapsed:.1f}초 "
+          f"({total_pages / elapsed if elapsed else 0:.1f} 페이지/초)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
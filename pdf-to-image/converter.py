@@ -0,0 +1,515 @@
+"""PDF → 이미지 변환 엔진 (Streamlit 없이 동작)
+
+프로세스 풀 워커가 pickle로 불러올 수 있도록 app.py와 분리된 모듈에 둔다.
+"""
+import io
+import os
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from pdf2image import convert_from_path
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject
+from PIL import Image
+
+def default_workers(num_pages):
+    return max(1, min(os.cpu_count() or 1, num_pages))
+
+# 인코딩 속도/크기 프리셋: PNG zlib 압축 단계, JPEG optimize(허프만 최적화)·progressive 여부
+ENCODE_PRESETS = {
+    "빠르게":    {"png_level": 1, "jpeg_optimize": False, "jpeg_progressive": False},
+    "균형":      {"png_level": 6, "jpeg_optimize": True,  "jpeg_progressive": False},
+    "최소 크기": {"png_level": 9, "jpeg_optimize": True,  "jpeg_progressive": True},
+}
+DEFAULT_PRESET = "균형"
+
+# 스캔 페이지(전면 JPEG 한 장) 처리: None이면 항상 poppler로 렌더링,
+# "native"는 원본 해상도 그대로, "fit"은 선택한 DPI 크기로 다시 샘플링
+PASSTHROUGH_MODES = {
+    "끄기":        None,
+    "원본 해상도": "native",
+    "DPI에 맞춤":  "fit",
+}
+DEFAULT_PASSTHROUGH = "DPI에 맞춤"
+
+# 명령줄(cli.py, benchmark.py)에서 입력하기 쉬운 영문 이름
+PRESET_NAMES = dict(zip(["fast", "balanced", "small"], ENCODE_PRESETS))
+SCAN_NAMES = dict(zip(["off", "native", "fit"], PASSTHROUGH_MODES))
+
+def english_name(names, value):
+    return next(k for k, v in names.items() if v == value)
+
+def img_to_bytes(img, fmt, quality, preset=DEFAULT_PRESET):
+    opts = ENCODE_PRESETS[preset]
+    buf = io.BytesIO()
+    if fmt == "JPG":
+        img.convert("RGB").save(buf, format="JPEG", quality=quality, optimize=opts["jpeg_optimize"],
+                                progressive=opts["jpeg_progressive"])
+    else:
+        img.save(buf, format="PNG", compress_level=opts["png_level"])
+    return buf.getvalue()
+
+def encode_file(path, fmt, quality, preset=DEFAULT_PRESET):
+    """디스크의 래스터 파일 하나를 읽어 인코딩 (이미지는 바로 닫음)"""
+    with Image.open(path) as img:
+        return img_to_bytes(img, fmt, quality, preset)
+
+def make_thumbnail(src, dst, width):
+    """미리보기용 축소 JPEG 생성 (JPEG 원본은 축소 디코딩)"""
+    with Image.open(src) as img:
+        img.draft("RGB", (width, width * 2))
+        img.thumbnail((width, width * 2))
+        img.convert("RGB").save(dst, format="JPEG", quality=80)
+    return dst
+
+def _encode_and_remove(key, path, fmt, quality, preset):
+    try:
+        return key, encode_file(path, fmt, quality, preset)
+    finally:
+        os.remove(path)
+
+def _iter_threaded(fn, arg_tuples, workers=None):
+    """fn(*args)를 스레드 풀에서 실행, 끝나는 순서대로 결과 (대기는 워커 수의 2배까지)"""
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="encode") as pool:
+        pending = set()
+        for args in arg_tuples:
+            pending.add(pool.submit(fn, *args))
+            if len(pending) >= workers * 2:
+                wait(pending, return_when=FIRST_COMPLETED)
+            for fut in [f for f in pending if f.done()]:
+                pending.discard(fut)
+                yield fut.result()
+        for fut in pending:
+            yield fut.result()
+
+def encode_pages(raw_pages, fmt, quality, preset=DEFAULT_PRESET, workers=None):
+    """(키, 래스터 파일) 흐름을 스레드 풀에서 인코딩, 끝나는 순서대로 (키, bytes)
+
+    Pillow 인코더는 GIL을 놓고 돌기 때문에 스레드로도 코어를 나눠 쓴다.
+    대기 중인 인코딩은 워커 수의 2배로 제한하고, 래스터 파일은 인코딩 후 지운다.
+    """
+    return _iter_threaded(
+        _encode_and_remove,
+        ((key, path, fmt, quality, preset) for key, path in raw_pages),
+        workers,
+    )
+
+# ── 스캔 페이지 직접 추출 ─────────────────────────────────────
+# 그리기 없이 상태만 바꾸는 연산자 (색·선·텍스트 위치 등)
+_STATE_OPS = {
+    b"q", b"Q", b"cm", b"w", b"J", b"j", b"M", b"d", b"ri", b"i",
+    b"g", b"G", b"rg", b"RG", b"k", b"K", b"cs", b"CS", b"sc", b"SC", b"scn", b"SCN",
+    b"BT", b"ET", b"Tc", b"Tw", b"Tz", b"TL", b"Tf", b"Ts", b"Td", b"TD", b"Tm", b"T*",
+    b"BMC", b"BDC", b"EMC", b"MP", b"DP",
+}
+_TEXT_SHOW_OPS = {b"Tj", b"TJ", b"'", b'"'}
+
+def _mul(m, n):
+    a, b, c, d, e, f = m
+    A, B, C, D, E, F = n
+    return (a * A + b * C, a * B + b * D, c * A + d * C, c * B + d * D,
+            e * A + f * C + E, e * B + f * D + F)
+
+def embedded_jpeg(page):
+    """페이지가 전면 JPEG 한 장뿐인 스캔 페이지면 (이미지 XObject, 가로 pt, 세로 pt), 아니면 None
+
+    OCR 문서의 보이지 않는 텍스트(Tr 3)와 페이지 전체를 덮는 사각형 클립은
+    허용한다. 회전·주석·마스크가 있거나, 이미지가 페이지를 꽉 채우지 않거나,
+    클립이 이미지를 잘라내면 렌더링 결과가 달라지므로 None.
+    """
+    try:
+        if page.get("/Rotate", 0) % 360 or page.get("/Annots"):
+            return None
+        xobjects = page["/Resources"].get_object()["/XObject"].get_object()
+        if len(xobjects) != 1:
+            return None
+        (name, ref), = xobjects.items()
+        xobj = ref.get_object()
+        filters = xobj.get("/Filter")
+        if isinstance(filters, ArrayObject):
+            filters = filters[0] if len(filters) == 1 else None
+        colorspace = xobj.get("/ColorSpace")
+        colorspace = colorspace.get_object() if colorspace is not None else None
+        if (xobj.get("/Subtype") != "/Image" or filters != "/DCTDecode"
+                or colorspace not in ("/DeviceRGB", "/DeviceGray")
+                or any(k in xobj for k in ("/SMask", "/Mask", "/Decode", "/ImageMask"))):
+            return None
+
+        box = page.cropbox
+        left, bottom = float(box.left), float(box.bottom)
+        width, height = float(box.width), float(box.height)
+        tol = max(1.0, 0.01 * max(width, height))
+
+        def covers_page(m):
+            a, b, c, d, e, f = m
+            return (abs(b) <= 1e-6 and abs(c) <= 1e-6 and abs(e - left) <= tol and abs(f - bottom) <= tol
+                    and abs(a - width) <= tol and abs(d - height) <= tol)
+
+        def rect_covers_page(x, y, w, h, m):
+            a, b, c, d, e, f = m
+            if abs(b) > 1e-6 or abs(c) > 1e-6:
+                return False
+            xs = sorted((a * x + e, a * (x + w) + e))
+            ys = sorted((d * y + f, d * (y + h) + f))
+            return (xs[0] <= left + tol and ys[0] <= bottom + tol
+                    and xs[1] >= left + width - tol and ys[1] >= bottom + height - tol)
+
+        ctm, text_mode, stack, drawn = (1, 0, 0, 1, 0, 0), 0, [], None
+        path = []   # 그리는 중인 경로의 사각형(re)마다 페이지를 덮는지
+        for operands, op in page.get_contents().operations:
+            if op == b"q":
+                stack.append((ctm, text_mode))
+            elif op == b"Q":
+                ctm, text_mode = stack.pop() if stack else (ctm, text_mode)
+            elif op == b"cm":
+                ctm = _mul(tuple(float(v) for v in operands), ctm)
+            elif op == b"re":
+                path.append(rect_covers_page(*(float(v) for v in operands), ctm))
+            elif op in (b"W", b"W*"):
+                # 클립은 페이지 전체를 덮는 사각형 하나일 때만
+                if len(path) != 1 or not path[0]:
+                    return None
+            elif op == b"n":
+                path = []
+            elif op == b"Tr":
+                text_mode = int(operands[0])
+            elif op in _TEXT_SHOW_OPS:
+                if text_mode != 3:
+                    return None
+            elif op == b"Do":
+                if drawn is not None or operands[0] != name:
+                    return None
+                drawn = ctm
+            elif op not in _STATE_OPS:
+                return None
+        if drawn is None or not covers_page(drawn):
+            return None
+        return xobj, width, height
+    except Exception:
+        return None
+
+def _strip_exif(data):
+    """JPEG에서 EXIF(APP1) 세그먼트만 제거 - 압축된 화소 데이터는 그대로"""
+    out = bytearray(data[:2])
+    pos = 2
+    while pos + 4 <= len(data) and data[pos] == 0xFF:
+        marker = data[pos + 1]
+        if marker == 0xDA:   # SOS - 이후는 영상 데이터
+            break
+        length = int.from_bytes(data[pos + 2:pos + 4], "big")
+        segment = data[pos:pos + 2 + length]
+        if not (marker == 0xE1 and segment[4:10] == b"Exif\0\0"):
+            out += segment
+        pos += 2 + length
+    out += data[pos:]
+    return bytes(out)
+
+def encode_embedded(key, data, width_pt, height_pt, dpi, fmt, quality,
+                    preset=DEFAULT_PRESET, passthrough="fit"):
+    """스캔 페이지의 원본 JPEG → 출력 bytes
+
+    "fit"이면 선택한 DPI의 픽셀 크기로 맞추고(줄일 때는 JPEG 축소 디코딩),
+    크기를 바꾸지 않는 JPG 출력은 원본 스트림을 그대로 돌려준다. poppler는
+    EXIF 방향을 무시하지만 이미지 뷰어는 따르므로, 방향 태그가 있으면 EXIF를 뺀다.
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        size = img.size
+        if passthrough == "fit":
+            size = (max(1, round(width_pt / 72 * dpi)), max(1, round(height_pt / 72 * dpi)))
+        if abs(size[0] - img.width) <= 1 and abs(size[1] - img.height) <= 1:
+            if fmt == "JPG" and img.mode in ("RGB", "L"):
+                if img.getexif().get(0x0112, 1) != 1:
+                    data = _strip_exif(data)
+                return key, data
+            return key, img_to_bytes(img, fmt, quality, preset)
+        img.draft(img.mode, size)
+        return key, img_to_bytes(img.resize(size, Image.LANCZOS), fmt, quality, preset)
+
+def encode_embedded_pages(items, dpi, fmt, quality, preset=DEFAULT_PRESET,
+                          passthrough="fit", workers=None):
+    """(키, 이미지 XObject, 가로 pt, 세로 pt) 흐름 → 끝나는 순서대로 (키, bytes)
+
+    pypdf 읽기는 호출 스레드에서, 디코딩/리샘플/인코딩만 스레드 풀에서 한다.
+    """
+    return _iter_threaded(
+        encode_embedded,
+        ((key, xobj.get_data(), w, h, dpi, fmt, quality, preset, passthrough)
+         for key, xobj, w, h in items),
+        workers,
+    )
+
+def parse_page_set(text, total):
+    """"1,3,5-9,190" 형식 → 정렬된 페이지 번호 목록 (형식 오류/범위 밖은 ValueError)"""
+    pages = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        if not start.isdigit() or (sep and not end.isdigit()):
+            raise ValueError(f"'{part}' 은(는) 올바른 페이지 지정이 아닙니다.")
+        first, last = int(start), int(end) if sep else int(start)
+        if first > last:
+            raise ValueError(f"'{part}': 시작 페이지가 끝 페이지보다 큽니다.")
+        if first < 1 or last > total:
+            raise ValueError(f"'{part}': 페이지는 1~{total} 범위여야 합니다.")
+        pages.update(range(first, last + 1))
+    if not pages:
+        raise ValueError("페이지를 하나 이상 지정하세요.")
+    return sorted(pages)
+
+def write_subset(reader, pages, path):
+    """선택한 페이지만 담은 PDF 저장 - 래스터화는 이 파일로만 한다"""
+    writer = PdfWriter()
+    for page in pages:
+        writer.add_page(reader.pages[page - 1])
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+def render_page(pdf_path, page, dpi, output_folder, name):
+    """워커 프로세스: 한 페이지만 output_folder에 PPM으로 래스터화, 경로 반환"""
+    paths = convert_from_path(
+        pdf_path, dpi=dpi, first_page=page, last_page=page,
+        fmt="ppm", output_folder=output_folder, output_file=name, paths_only=True,
+    )
+    return paths[0]
+
+def iter_render(tasks, dpi, output_folder, pool=None, workers=None):
+    """(키, PDF 경로, 페이지) 작업들을 프로세스 풀에서 래스터화, 끝나는 순서대로 (키, 파일 경로)
+
+    PDF 내용 대신 경로만 넘기므로 워커마다 파일을 복사해 보내지 않는다.
+    여러 문서의 작업을 한 흐름으로 넘기면 문서 경계에서도 워커가 쉬지 않는다.
+    pool을 주면 그 풀(세션 공유)에 넣고, 없으면 이 호출 동안 쓸 풀을 만든다.
+    동시에 진행되는 작업은 워커 수의 2배로 제한해, 호출자가 받은 파일을
+    처리하고 지우는 동안 디스크/메모리에 쌓이는 페이지 수가 일정하다.
+    """
+    if pool is None:
+        tasks = list(tasks)
+        if not tasks:
+            return
+        workers = workers or default_workers(len(tasks))
+        with ProcessPoolExecutor(max_workers=workers) as own_pool:
+            yield from iter_render(tasks, dpi, output_folder, own_pool, workers)
+        return
+
+    window = (workers or os.cpu_count() or 1) * 2
+    tasks = iter(tasks)
+    running = {}   # Future -> 키
+    seq = 0
+    try:
+        while True:
+            for key, pdf_path, page in tasks:
+                seq += 1
+                fut = pool.submit(render_page, pdf_path, page, dpi, output_folder, f"t{seq:06d}")
+                running[fut] = key
+                if len(running) >= window:
+                    break
+            if not running:
+                return
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield running.pop(fut), fut.result()
+    finally:
+        for fut in running:
+            fut.cancel()
+
+def iter_pages(pdf_path, pages, dpi, output_folder, pool=None, workers=None):
+    """PDF 하나의 페이지들을 래스터화, 끝나는 순서대로 (페이지, 파일 경로)"""
+    tasks = ((page, pdf_path, page) for page in pages)
+    return iter_render(tasks, dpi, output_folder, pool, workers or default_workers(len(pages)))
+
+def pdf_digest(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+class PageCache:
+    """(PDF SHA-256, DPI, 형식, 품질, 프리셋, 스캔 처리, 페이지) 키의 인코딩된 페이지 이미지 캐시
+
+    디스크에 저장하고 총 크기가 max_bytes를 넘으면 가장 오래 쓰지 않은
+    페이지부터 지운다. 재시작해도 기존 파일은 수정 시각 순으로 다시 읽는다.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # 파일 경로 -> 크기 (오래된 순)
+        self._bytes = 0
+        files = []
+        for dirpath, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                if name.endswith(".tmp"):
+                    os.remove(path)
+                    continue
+                st = os.stat(path)
+                files.append((st.st_mtime, path, st.st_size))
+        for _, path, size in sorted(files):
+            self._entries[path] = size
+            self._bytes += size
+
+    def path(self, digest, dpi, fmt, quality, preset, page, passthrough=None):
+        ext = "jpg" if fmt == "JPG" else "png"
+        q = quality if fmt == "JPG" else 0
+        mode = list(ENCODE_PRESETS).index(preset)
+        if passthrough:
+            mode = f"{mode}{passthrough[0]}"
+        return os.path.join(self.root, digest[:2], f"{digest}_{dpi}_{q}_{mode}_p{page:05d}.{ext}")
+
+    def get(self, key_path):
+        """있으면 최근 사용으로 표시하고 경로 반환, 없으면 None"""
+        with self._lock:
+            if key_path not in self._entries:
+                return None
+            self._entries.move_to_end(key_path)
+        try:
+            os.utime(key_path)
+        except OSError:
+            with self._lock:
+                self._bytes -= self._entries.pop(key_path, 0)
+            return None
+        return key_path
+
+    def put(self, key_path, data):
+        os.makedirs(os.path.dirname(key_path), exist_ok=True)
+        tmp = f"{key_path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, key_path)
+        with self._lock:
+            self._bytes += len(data) - self._entries.pop(key_path, 0)
+            self._entries[key_path] = len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old, size = self._entries.popitem(last=False)
+                self._bytes -= size
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+        return key_path
+
+def link_or_copy(src, dst):
+    """캐시 파일을 결과 폴더로 (하드 링크라 캐시에서 지워져도 남음)"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+# ── 변환 파이프라인 (앱·CLI·벤치마크 공용) ───────────────────
+# 문서는 dict: "reader"(PdfReader), "total", "pages"(변환할 페이지 번호),
+# 원본은 "path" 또는 "bytes", 캐시를 쓰면 "digest"(pdf_digest)도 필요.
+
+def load_document(path, with_digest=False):
+    """PDF 파일 → 파이프라인용 문서 dict (전체 페이지, 캐시를 쓰려면 with_digest)"""
+    with open(path, "rb") as f:
+        pdf_bytes = f.read()
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    total = len(reader.pages)
+    return {
+        "name": os.path.basename(path),
+        "path": path,
+        "digest": pdf_digest(pdf_bytes) if with_digest else None,
+        "reader": reader,
+        "total": total,
+        "pages": list(range(1, total + 1)),
+    }
+
+def plan_documents(docs, dpi, fmt, quality, preset=DEFAULT_PRESET, passthrough=None, cache=None):
+    """문서마다 페이지를 캐시 적중 / 스캔 추출 / 렌더링으로 나눠 doc에 기록
+
+    doc["cached"] {페이지: 파일}, doc["embedded"] {페이지: embedded_jpeg 결과},
+    doc["missing"] [렌더링할 페이지]. (캐시, 추출, 렌더링) 장 수를 반환한다.
+    """
+    counts = [0, 0, 0]
+    for doc in docs:
+        doc["cached"] = {}
+        if cache is not None:
+            for p in doc["pages"]:
+                hit = cache.get(cache.path(doc["digest"], dpi, fmt, quality, preset, p, passthrough))
+                if hit:
+                    doc["cached"][p] = hit
+        missing = [p for p in doc["pages"] if p not in doc["cached"]]
+        # 전면 JPEG 한 장짜리 스캔 페이지는 렌더링 대상에서 빼고 원본 이미지를 추출
+        doc["embedded"] = {}
+        if passthrough:
+            for p in missing:
+                found = embedded_jpeg(doc["reader"].pages[p - 1])
+                if found:
+                    doc["embedded"][p] = found
+        doc["missing"] = [p for p in missing if p not in doc["embedded"]]
+        counts[0] += len(doc["cached"])
+        counts[1] += len(doc["embedded"])
+        counts[2] += len(doc["missing"])
+    return tuple(counts)
+
+def convert_documents(docs, work_dir, dpi, fmt, quality, preset=DEFAULT_PRESET, passthrough=None,
+                      cache=None, pool=None, workers=None):
+    """plan_documents로 나눈 문서들을 변환, (문서 번호, 페이지, 이미지 파일) 흐름
+
+    캐시 적중 → 스캔 추출 → 렌더링 순으로, 각 단계 안에서는 끝나는 순서대로 낸다.
+    cache가 있으면 결과 파일은 캐시 안에, 없으면 work_dir 안에 만든다.
+    pool을 주면 래스터화를 그 풀에 넣고, 없으면 이 호출 동안 쓸 풀을 만든다.
+    """
+    ext = "jpg" if fmt == "JPG" else "png"
+    raw_dir = os.path.join(work_dir, "raw")
+    os.makedirs(raw_dir, exist_ok=True)
+    source_paths = []
+
+    def store(i, page_num, data):
+        if cache is not None:
+            return cache.put(cache.path(docs[i]["digest"], dpi, fmt, quality, preset, page_num, passthrough), data)
+        path = os.path.join(work_dir, f"d{i:04d}_p{page_num:05d}.{ext}")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def render_tasks():
+        """모든 문서의 남은 페이지를 한 흐름으로 - 문서 사이에서 풀이 쉬지 않음"""
+        for i, doc in enumerate(docs):
+            if not doc["missing"]:
+                continue
+            # 워커 프로세스가 각자 읽도록 파일 경로로 넘김 -
+            # 일부 페이지만 필요하면 그 페이지만 담은 작은 PDF로
+            subset_pages = doc["missing"]
+            if len(doc["missing"]) == doc["total"] and doc.get("path"):
+                pdf_path = doc["path"]
+            else:
+                pdf_path = os.path.join(work_dir, f"source{i:04d}.pdf")
+                source_paths.append(pdf_path)
+                if len(doc["missing"]) == doc["total"]:
+                    with open(pdf_path, "wb") as f:
+                        f.write(doc["bytes"])
+                else:
+                    write_subset(doc["reader"], doc["missing"], pdf_path)
+                    subset_pages = range(1, len(doc["missing"]) + 1)
+            for sub_page, page_num in zip(subset_pages, doc["missing"]):
+                yield (i, page_num), pdf_path, sub_page
+
+    try:
+        for i, doc in enumerate(docs):
+            for page_num, path in doc["cached"].items():
+                yield i, page_num, path
+
+        # 스캔 페이지: 원본 JPEG 추출 → (필요하면 리샘플) → 저장
+        embedded_items = (
+            ((i, page_num), xobj, w, h)
+            for i, doc in enumerate(docs)
+            for page_num, (xobj, w, h) in doc["embedded"].items()
+        )
+        for (i, page_num), b in encode_embedded_pages(
+            embedded_items, dpi, fmt, quality, preset, passthrough, workers
+        ):
+            yield i, page_num, store(i, page_num, b)
+
+        # 나머지: 래스터화(프로세스) → 인코딩(스레드) → 저장
+        rendered = iter_render(render_tasks(), dpi, raw_dir, pool=pool, workers=workers)
+        for (i, page_num), b in encode_pages(rendered, fmt, quality, preset, workers):
+            yield i, page_num, store(i, page_num, b)
+    finally:
+        for pdf_path in source_paths:
+            if os.path.exists(pdf_path):
+                os.remove(pdf_path)